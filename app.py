@@ -6,6 +6,11 @@ from config import Config
 from utils.db import db
 from utils.error_handlers import register_error_handlers
 from utils.cloudinary_service import configure_cloudinary
+from utils.background import background_tasks
+from utils.response_cache import response_cache
+from utils.paystack_service import paystack_service
+from utils.conditional_get import register_conditional_get
+from utils.json_encoding import init_json
 from schemas import ma
 
 migrate = Migrate()
@@ -29,36 +34,57 @@ def create_app():
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
-    api.init_app(app)  # ← INITIALIZE API WITH APP
     ma.init_app(app) # ← INITIALIZE MARSHMALLOW WITH APP
+    background_tasks.init_app(app)
+    response_cache.init_app(app)
+    paystack_service.init_app(app)
 
     # Register error handlers
     register_error_handlers(app)
+    register_conditional_get(app)
+
+    # Register CLI commands
+    from utils.dashboard_stats import stats_cli
+    app.cli.add_command(stats_cli)
+    from utils.webhook_events import webhooks_cli
+    app.cli.add_command(webhooks_cli)
+    from utils.payment_reconciliation import payments_cli
+    app.cli.add_command(payments_cli)
+    from utils.email_service import email_cli
+    app.cli.add_command(email_cli)
 
     # Import and register blueprints (keep for non-RESTful routes if needed)
     from routes.auth_routes import auth_bp
     from routes.contact_routes import contact_bp
     from routes.upload_routes import upload_bp
     from routes.paystack_webhook import paystack_bp
+    from routes.export_routes import export_bp
+    from routes.auth_routes import api as auth_api
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(contact_bp, url_prefix="/api")
     app.register_blueprint(upload_bp, url_prefix="/api")
     app.register_blueprint(paystack_bp)
+    app.register_blueprint(export_bp, url_prefix="/api/admin")
+
+    # Fast JSON for Flask-RESTful resources (both Apis) and jsonify
+    init_json(app, api, auth_api)
 
     # Register Flask-RESTful resources
     from resources.traveler_resources import TravelerList, TravelerDetail
-    from resources.guide_resources import GuideList, GuideDetail
+    from resources.guide_resources import GuideList, GuideDetail, GuideAvailability, AvailableGuides
     from resources.booking_resources import BookingList, BookingDetail
     from resources.destination_resources import DestinationList, DestinationDetail
-    from resources.payment_resources import PaymentList, PaymentDetail
-    from resources.admin_resources import AdminDashboard, AdminUsers
+    from resources.payment_resources import PaymentList, PaymentDetail, PaymentAuthorization
+    from resources.admin_resources import AdminDashboard, AdminUsers, AdminPaystackMetrics, AdminConditionalGetMetrics
     
     api.add_resource(TravelerList, '/api/travelers')
     api.add_resource(TravelerDetail, '/api/travelers/<int:traveler_id>')
     
     api.add_resource(GuideList, '/api/guides')
+    api.add_resource(AvailableGuides, '/api/guides/available')
     api.add_resource(GuideDetail, '/api/guides/<int:guide_id>')
+    api.add_resource(GuideAvailability, '/api/guides/<int:guide_id>/availability')
     
     api.add_resource(BookingList, '/api/bookings')
     api.add_resource(BookingDetail, '/api/bookings/<int:booking_id>')
@@ -68,9 +94,15 @@ def create_app():
     
     api.add_resource(PaymentList, '/api/payments')
     api.add_resource(PaymentDetail, '/api/payments/<int:payment_id>')
+    api.add_resource(PaymentAuthorization, '/api/payments/<int:payment_id>/authorization')
     
     api.add_resource(AdminDashboard, '/api/admin/dashboard')
     api.add_resource(AdminUsers, '/api/admin/users')
+    api.add_resource(AdminPaystackMetrics, '/api/admin/metrics/paystack')
+    api.add_resource(AdminConditionalGetMetrics, '/api/admin/metrics/conditional-get')
+
+    # Api.init_app only registers resources added before it is called
+    api.init_app(app)
 
     @app.route('/')
     def index():
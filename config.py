@@ -5,6 +5,9 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///safarihub.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Seconds an authenticated user's role profile ids stay cached in-process
+    AUTH_CACHE_TTL = int(os.getenv("AUTH_CACHE_TTL", "60"))
+
     # Cloudinary Configuration
     CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME")
     CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY")
@@ -12,4 +15,25 @@ class Config:
 
     # PayStack Configuration
     PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
-    PAYSTACK_PUBLIC_KEY = os.getenv("PAYSTACK_PUBLIC_KEY")
\ No newline at end of file
+    PAYSTACK_PUBLIC_KEY = os.getenv("PAYSTACK_PUBLIC_KEY")
+    PAYSTACK_BASE_URL = os.getenv("PAYSTACK_BASE_URL", "https://api.paystack.co")
+    # (connect, read) timeouts in seconds and keep-alive connections per worker for PayStack calls
+    PAYSTACK_CONNECT_TIMEOUT = float(os.getenv("PAYSTACK_CONNECT_TIMEOUT", "3.05"))
+    PAYSTACK_READ_TIMEOUT = float(os.getenv("PAYSTACK_READ_TIMEOUT", "10"))
+    PAYSTACK_POOL_SIZE = int(os.getenv("PAYSTACK_POOL_SIZE", "10"))
+
+    # SendGrid (outbound email is queued in email_outbox and delivered by `flask email drain`)
+    SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
+
+    # Public destination/guide responses; set RESPONSE_CACHE_URL (redis://) to share the cache and its purges across workers
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+    RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL")
+
+    # Initialize PayStack transactions off the request thread (clients can also send Prefer: respond-async)
+    PAYMENT_INIT_ASYNC = os.getenv("PAYMENT_INIT_ASYNC", "false").lower() == "true"
+    BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", "4"))
+
+    # Response encoder: "orjson" (falls back to the stdlib when not installed) or "json"
+    JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson")
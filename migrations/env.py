@@ -45,6 +45,40 @@ target_db = current_app.extensions['migrate'].db
 # ... etc.
 
 
+# Full-text search objects created by hand in 9b0c2e5d7f41; the models don't
+# declare them, so autogenerate and `flask db check` must not report them
+FULLTEXT_TABLE_PREFIX = 'destinations_fts'
+FULLTEXT_INDEXES = ('ix_destinations_search_vector',)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith(FULLTEXT_TABLE_PREFIX):
+        return False
+    if type_ == 'column' and name == 'search_vector' and object.table.name == 'destinations':
+        return False
+    if type_ == 'index' and name in FULLTEXT_INDEXES:
+        return False
+    return True
+
+
+# 7a3e5c0d9b16 keeps these columns TEXT on SQLite, which stores JSON as text anyway.
+# Converting them would rebuild destinations and drop the destinations_fts sync
+# triggers, so autogenerate must not report TEXT -> JSON for them either.
+SQLITE_JSON_TEXT_COLUMNS = {
+    ('destinations', 'included_amenities'),
+    ('destinations', 'images'),
+    ('destinations', 'image_variants'),
+}
+
+
+def compare_type(context, inspected_column, metadata_column, inspected_type, metadata_type):
+    if context.dialect.name == 'sqlite' and \
+            (metadata_column.table.name, metadata_column.name) in SQLITE_JSON_TEXT_COLUMNS:
+        return False
+    # Alembic's default comparison
+    return None
+
+
 def get_metadata():
     if hasattr(target_db, 'metadatas'):
         return target_db.metadatas[None]
@@ -65,7 +99,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object, compare_type=compare_type
     )
 
     with context.begin_transaction():
@@ -93,6 +128,11 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
+    # Flask-Migrate passes compare_type=True; keep type comparison but through the hook
+    if conf_args.get("compare_type", True) is True:
+        conf_args["compare_type"] = compare_type
 
     connectable = get_engine()
 
@@ -0,0 +1,85 @@
+"""Use JSON columns for destination amenities and images
+
+Revision ID: 7a3e5c0d9b16
+Revises: 0c4d8e27f5b9
+Create Date: 2026-10-17 16:12:44.905513
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3e5c0d9b16'
+down_revision = '0c4d8e27f5b9'
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = ('included_amenities', 'images', 'image_variants')
+
+
+def _reject_constant(name):
+    # NaN/Infinity load in Python but not in jsonb
+    raise ValueError(name)
+
+
+def _clean_json_text(bind):
+    """Rewrite values that are not valid JSON, the same way on every dialect.
+
+    Blank values become NULL, free-text lists are kept as a single-item array
+    rather than lost, and unreadable image_variants are dropped (they are computed
+    from image_url when read).
+    """
+    destinations = sa.table('destinations', sa.column('id', sa.Integer),
+                            *[sa.column(column, sa.Text) for column in JSON_COLUMNS])
+    rows = bind.execute(sa.select(destinations)).fetchall()
+    for row in rows:
+        values = {}
+        for column in JSON_COLUMNS:
+            value = row._mapping[column]
+            if value is None:
+                continue
+            if not value.strip():
+                values[column] = None
+                continue
+            try:
+                json.loads(value, parse_constant=_reject_constant)
+            except ValueError:
+                values[column] = None if column == 'image_variants' else json.dumps([value])
+        if values:
+            bind.execute(destinations.update().where(destinations.c.id == row.id).values(**values))
+
+
+def upgrade():
+    bind = op.get_bind()
+    _clean_json_text(bind)
+
+    if bind.dialect.name == 'postgresql':
+        for column in JSON_COLUMNS:
+            op.alter_column('destinations', column,
+                            existing_type=sa.Text(),
+                            type_=postgresql.JSONB(astext_type=sa.Text()),
+                            existing_nullable=True,
+                            postgresql_using=f'{column}::jsonb')
+        op.execute(
+            "CREATE INDEX ix_destinations_included_amenities ON destinations "
+            "USING gin (included_amenities jsonb_path_ops)"
+        )
+    # SQLite stores JSON as text already; rebuilding the table would also drop the
+    # destinations_fts triggers, so the cleaned text columns are kept as they are
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_destinations_included_amenities', table_name='destinations')
+        for column in JSON_COLUMNS:
+            op.alter_column('destinations', column,
+                            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+                            type_=sa.Text(),
+                            existing_nullable=True,
+                            postgresql_using=f'{column}::text')
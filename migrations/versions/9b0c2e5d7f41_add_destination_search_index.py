@@ -0,0 +1,77 @@
+"""Add full-text search index for destinations
+
+Revision ID: 9b0c2e5d7f41
+Revises: 880397358459
+Create Date: 2026-10-17 12:04:37.861520
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '9b0c2e5d7f41'
+down_revision = '880397358459'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        # External-content FTS5 table: stores only the index, rows are read from destinations
+        op.execute("""
+            CREATE VIRTUAL TABLE destinations_fts USING fts5(
+                name, description, country,
+                content='destinations', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER destinations_fts_ai AFTER INSERT ON destinations BEGIN
+                INSERT INTO destinations_fts(rowid, name, description, country)
+                VALUES (new.id, new.name, new.description, new.country);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER destinations_fts_ad AFTER DELETE ON destinations BEGIN
+                INSERT INTO destinations_fts(destinations_fts, rowid, name, description, country)
+                VALUES ('delete', old.id, old.name, old.description, old.country);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER destinations_fts_au AFTER UPDATE ON destinations BEGIN
+                INSERT INTO destinations_fts(destinations_fts, rowid, name, description, country)
+                VALUES ('delete', old.id, old.name, old.description, old.country);
+                INSERT INTO destinations_fts(rowid, name, description, country)
+                VALUES (new.id, new.name, new.description, new.country);
+            END
+        """)
+        op.execute("INSERT INTO destinations_fts(destinations_fts) VALUES ('rebuild')")
+
+    elif dialect == 'postgresql':
+        # Generated column so every insert/update keeps the vector current without triggers
+        op.execute("""
+            ALTER TABLE destinations ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('simple', coalesce(name, '')), 'A') ||
+                setweight(to_tsvector('simple', coalesce(country, '')), 'B') ||
+                setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+            ) STORED
+        """)
+        op.create_index('ix_destinations_search_vector', 'destinations', ['search_vector'],
+                        unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS destinations_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS destinations_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS destinations_fts_ai")
+        op.execute("DROP TABLE IF EXISTS destinations_fts")
+
+    elif dialect == 'postgresql':
+        op.drop_index('ix_destinations_search_vector', table_name='destinations')
+        op.execute("ALTER TABLE destinations DROP COLUMN search_vector")
@@ -1,7 +1,19 @@
 from utils.db import db
+from datetime import datetime
 
 class Booking(db.Model):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # A guide's bookings on a given day (guide_day_slots now enforces one active booking per day)
+        db.Index("ix_bookings_guide_id_date_status", "guide_id", "date", "status"),
+        # Per-role booking listings, newest first
+        db.Index("ix_bookings_traveler_id_created_at", "traveler_id", "created_at"),
+        db.Index("ix_bookings_guide_id_created_at", "guide_id", "created_at"),
+        db.Index("ix_bookings_status_created_at", "status", "created_at"),
+        db.Index("ix_bookings_created_at_id", "created_at", "id"),
+        # Active-booking check before deleting a destination
+        db.Index("ix_bookings_destination_id_status", "destination_id", "status"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     traveler_id = db.Column(db.Integer, db.ForeignKey("travelers.id"), nullable=False)
@@ -9,3 +21,10 @@ class Booking(db.Model):
     destination_id = db.Column(db.Integer, db.ForeignKey("destinations.id"))
     date = db.Column(db.Date)
     status = db.Column(db.String(50), default="pending")
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Relationships
+    traveler = db.relationship("Traveler", lazy=True)
+    guide = db.relationship("Guide", lazy=True)
+    destination = db.relationship("Destination", lazy=True)
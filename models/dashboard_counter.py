@@ -0,0 +1,8 @@
+from utils.db import db
+
+class DashboardCounter(db.Model):
+    __tablename__ = "dashboard_counters"
+
+    # e.g. "users:role:traveler", "bookings:status:confirmed", "revenue:currency:KES"
+    name = db.Column(db.String(100), primary_key=True)
+    value = db.Column(db.Float, nullable=False, default=0)
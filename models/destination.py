@@ -1,8 +1,16 @@
 from utils.db import db
-import json
+from datetime import datetime
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB on Postgres (GIN-indexed containment for amenity filters), JSON text elsewhere
+JSONType = db.JSON().with_variant(JSONB(), 'postgresql')
 
 class Destination(db.Model):
     __tablename__ = 'destinations'
+    __table_args__ = (
+        db.Index('ix_destinations_name_id', 'name', 'id'),
+        db.Index('ix_destinations_category_name', 'category', 'name'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     country = db.Column(db.String(50), nullable=False)
@@ -14,10 +22,12 @@ class Destination(db.Model):
     # New fields for enhanced destination data
     guide_id = db.Column(db.Integer, db.ForeignKey("guides.id"), nullable=True)
     duration_days = db.Column(db.Integer, nullable=True)
-    included_amenities = db.Column(db.Text, nullable=True)  # JSON array of amenities
+    included_amenities = db.Column(JSONType, nullable=True)  # Array of amenity names
     itinerary = db.Column(db.Text, nullable=True)
     max_travelers = db.Column(db.Integer, nullable=True)
-    images = db.Column(db.Text, nullable=True)  # JSON array of image URLs
+    images = db.Column(JSONType, nullable=True)  # Array of image URLs
+    image_variants = db.Column(JSONType, nullable=True)  # Thumbnail/medium/large URLs for image_url and images
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationships
     assigned_guide = db.relationship("Guide", backref="destinations", uselist=False)
@@ -33,8 +43,9 @@ class Destination(db.Model):
             "category": self.category,
             "guide_id": self.guide_id,
             "duration_days": self.duration_days,
-            "included_amenities": json.loads(self.included_amenities) if self.included_amenities else [],
+            "included_amenities": self.included_amenities or [],
             "itinerary": self.itinerary,
             "max_travelers": self.max_travelers,
-            "images": json.loads(self.images) if self.images else []
+            "images": self.images or [],
+            "image_variants": self.image_variants or {}
         }
\ No newline at end of file
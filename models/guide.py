@@ -1,10 +1,68 @@
 from utils.db import db
+from datetime import datetime
+from sqlalchemy.orm import validates
+
+def split_tags(value):
+    """Normalized, de-duplicated names from a comma-separated string ("English, swahili" -> ["english", "swahili"])"""
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip().lower()[:50]
+        if name and name not in names:
+            names.append(name)
+    return names
+
+class GuideLanguage(db.Model):
+    __tablename__ = "guide_languages"
+    __table_args__ = (
+        # Language filters look up guides by name
+        db.Index("ix_guide_languages_language_guide_id", "language", "guide_id"),
+    )
+
+    guide_id = db.Column(db.Integer, db.ForeignKey("guides.id", ondelete="CASCADE"), primary_key=True)
+    language = db.Column(db.String(50), primary_key=True)
+
+class GuideSpecialty(db.Model):
+    __tablename__ = "guide_specialties"
+    __table_args__ = (
+        db.Index("ix_guide_specialties_specialty_guide_id", "specialty", "guide_id"),
+    )
+
+    guide_id = db.Column(db.Integer, db.ForeignKey("guides.id", ondelete="CASCADE"), primary_key=True)
+    specialty = db.Column(db.String(50), primary_key=True)
 
 class Guide(db.Model):
     __tablename__ = "guides"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     experience_years = db.Column(db.Integer)
+    # Comma-separated, as entered; guide_languages / guide_specialties hold the normalized names for filtering
     languages = db.Column(db.String(200))
+    specialties = db.Column(db.String(200))
     bio = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    language_entries = db.relationship("GuideLanguage", cascade="all, delete-orphan", lazy=True)
+    specialty_entries = db.relationship("GuideSpecialty", cascade="all, delete-orphan", lazy=True)
+
+    @validates("languages")
+    def _sync_languages(self, key, value):
+        self._sync_entries(self.language_entries, GuideLanguage, "language", value)
+        return value
+
+    @validates("specialties")
+    def _sync_specialties(self, key, value):
+        self._sync_entries(self.specialty_entries, GuideSpecialty, "specialty", value)
+        return value
+
+    @staticmethod
+    def _sync_entries(entries, model, name_attr, value):
+        """Make the association rows match the string, keeping rows that did not change"""
+        names = split_tags(value)
+        for entry in list(entries):
+            if getattr(entry, name_attr) not in names:
+                entries.remove(entry)
+        existing = {getattr(entry, name_attr) for entry in entries}
+        for name in names:
+            if name not in existing:
+                entries.append(model(**{name_attr: name}))
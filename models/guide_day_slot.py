@@ -0,0 +1,23 @@
+from utils.db import db
+from datetime import datetime
+
+class GuideDaySlot(db.Model):
+    """A day a guide is taken by an active (pending or confirmed) booking.
+
+    The unique (guide_id, date) constraint is what makes a claim atomic: of two
+    concurrent bookings for the same day only one INSERT can succeed. It also
+    serves availability range reads for a guide.
+    """
+    __tablename__ = "guide_day_slots"
+    __table_args__ = (
+        db.UniqueConstraint("guide_id", "date", name="uq_guide_day_slots_guide_id_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    guide_id = db.Column(db.Integer, db.ForeignKey("guides.id"), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    booking_id = db.Column(db.Integer, db.ForeignKey("bookings.id"), nullable=False, unique=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<GuideDaySlot guide={self.guide_id} {self.date} booking={self.booking_id}>'
@@ -3,6 +3,13 @@ from datetime import datetime
 
 class Payment(db.Model):
     __tablename__ = "payments"
+    __table_args__ = (
+        # Completed-payment check per booking and payment lookups by booking
+        db.Index("ix_payments_booking_id_status", "booking_id", "status"),
+        # Payment listings, newest first
+        db.Index("ix_payments_status_created_at", "status", "created_at"),
+        db.Index("ix_payments_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     booking_id = db.Column(db.Integer, db.ForeignKey("bookings.id"), nullable=False)
@@ -11,9 +18,10 @@ class Payment(db.Model):
     status = db.Column(db.String(50), default="pending")  # pending, processing, completed, failed, refunded
     transaction_id = db.Column(db.String(120), unique=True)  # PayStack reference
     paystack_access_code = db.Column(db.String(100))  # NEW: PayStack access code
+    authorization_url = db.Column(db.String(300))  # PayStack checkout URL, set once initialization succeeds
     currency = db.Column(db.String(10), default="KES")  # NEW: Currency
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
     # Relationship with Booking
     booking = db.relationship("Booking", backref="payments", lazy=True)
@@ -35,6 +43,7 @@ class Payment(db.Model):
             'status': self.status,
             'transaction_id': self.transaction_id,
             'paystack_access_code': self.paystack_access_code,
+            'authorization_url': self.authorization_url,
             'currency': self.currency,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -1,9 +1,11 @@
 from utils.db import db
+from datetime import datetime
 
 class Traveler(db.Model):
     __tablename__ = "travelers"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     nationality = db.Column(db.String(100))
     preferences = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
@@ -1,11 +1,12 @@
 from utils.db import db
+from datetime import datetime
 from werkzeug.security import generate_password_hash, check_password_hash
 
 class User(db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
-    full_name = db.Column(db.String(100), nullable=False)
+    full_name = db.Column(db.String(100), nullable=False, index=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(256), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # 'traveler', 'guide', 'admin'
@@ -13,6 +14,12 @@ class User(db.Model):
     # New field for cloudinary profile image
     profile_image_url = db.Column(db.String(255), nullable=True)
 
+    # Incremented to revoke every token issued before the change (see create_token)
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Bumped on every change; conditional GET fingerprints read max(updated_at)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
     traveler_profile = db.relationship("Traveler", backref="user", uselist=False)
     guide_profile = db.relationship("Guide", backref="user", uselist=False)
     admin_profile = db.relationship("Admin", backref="user", uselist=False)
@@ -0,0 +1,24 @@
+from utils.db import db
+from datetime import datetime
+
+class WebhookEvent(db.Model):
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # The consumer drains pending events in arrival order
+        db.Index("ix_webhook_events_status_id", "status", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    # "<event>:<paystack transaction id or reference>"; retried deliveries share a key
+    event_key = db.Column(db.String(200), unique=True, nullable=False)
+    event = db.Column(db.String(100), nullable=False)
+    reference = db.Column(db.String(120), index=True)
+    payload = db.Column(db.Text, nullable=False)  # Raw request body as signed by PayStack
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, processed, ignored, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text)
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    processed_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f'<WebhookEvent {self.id} - {self.event_key} - {self.status}>'
@@ -8,72 +8,55 @@ from models.guide import Guide
 from models.booking import Booking
 from models.destination import Destination
 from models.payment import Payment
-from schemas import UserSchema, TravelerSchema, GuideSchema, BookingSchema, DestinationSchema, PaymentSchema
+from schemas import UserSchema, TravelerSchema, GuideSchema, BookingSchema, DestinationSchema, PaymentSchema, CompiledSchema
 from utils.jwt_service import role_required
+from utils.auth_context import invalidate_auth_cache
 from utils.error_handlers import ValidationError, NotFoundError
-
-user_schema = UserSchema()
-traveler_schema = TravelerSchema()
-guide_schema = GuideSchema()
-booking_schema = BookingSchema()
-destination_schema = DestinationSchema()
-payment_schema = PaymentSchema()
+from utils.helpers import keyset_paginate, count_grouped
+from utils.dashboard_stats import get_dashboard_statistics, get_recent_bookings, record_user_role_change
+from utils.paystack_service import paystack_service
+from utils.conditional_get import conditional_get, conditional_get_metrics, table_version, latest_updates
+
+user_schema = CompiledSchema(UserSchema)
+traveler_schema = CompiledSchema(TravelerSchema)
+guide_schema = CompiledSchema(GuideSchema)
+booking_schema = CompiledSchema(BookingSchema)
+destination_schema = CompiledSchema(DestinationSchema)
+payment_schema = CompiledSchema(PaymentSchema)
 
 class AdminDashboard(Resource):
     @role_required('admin')
-    def get(self, user):
+    def get(self):
         try:
-            # Get statistics
-            total_users = User.query.count()
-            total_travelers = Traveler.query.count()
-            total_guides = Guide.query.count()
-            total_destinations = Destination.query.count()
-            total_bookings = Booking.query.count()
-            active_bookings = Booking.query.filter_by(status='confirmed').count()
-
-            # Calculate total revenue from completed payments
-            total_revenue = db.session.query(db.func.sum(Payment.amount)).filter(
-                Payment.status == 'completed'
-            ).scalar() or 0
-
-            # Get recent bookings (last 10)
-            recent_bookings = Booking.query.order_by(Booking.created_at.desc()).limit(10).all()
-            recent_bookings_data = []
-            for booking in recent_bookings:
-                traveler = Traveler.query.get(booking.traveler_id)
-                traveler_user = User.query.get(traveler.user_id) if traveler else None
-                destination = Destination.query.get(booking.destination_id)
-                guide = Guide.query.get(booking.guide_id)
-                guide_user = User.query.get(guide.user_id) if guide else None
-
-                recent_bookings_data.append({
-                    'id': booking.id,
-                    'traveler_name': traveler_user.full_name if traveler_user else 'Unknown',
-                    'destination_name': destination.name if destination else 'Unknown',
-                    'guide_name': guide_user.full_name if guide_user else 'Not assigned',
-                    'status': booking.status,
-                    'created_at': booking.created_at.isoformat() if booking.created_at else None
-                })
-
+            # Counters and the recent-bookings feed each come from a single query
             return {
-                'statistics': {
-                    'total_users': total_users,
-                    'total_travelers': total_travelers,
-                    'total_guides': total_guides,
-                    'total_destinations': total_destinations,
-                    'total_bookings': total_bookings,
-                    'active_bookings': active_bookings,
-                    'total_revenue': float(total_revenue)
-                },
-                'recent_bookings': recent_bookings_data
+                'statistics': get_dashboard_statistics(),
+                'recent_bookings': get_recent_bookings(limit=10)
             }, 200
 
         except Exception as e:
             return {'error': f'Failed to fetch dashboard data: {str(e)}'}, 500
 
+class AdminPaystackMetrics(Resource):
+    @role_required('admin')
+    def get(self):
+        """Latency and error counts for outbound PayStack calls made by this worker"""
+        return {'endpoints': paystack_service.metrics.snapshot()}, 200
+
+class AdminConditionalGetMetrics(Resource):
+    @role_required('admin')
+    def get(self):
+        """GET requests, 304s and pre-handler 304s per endpoint, for this worker"""
+        return {'endpoints': conditional_get_metrics.snapshot()}, 200
+
+def admin_users_version():
+    # Rows embed the traveler or guide profile
+    return [table_version(User), latest_updates(Traveler, Guide)]
+
 class AdminUsers(Resource):
     @role_required('admin')
-    def get(self, user):
+    @conditional_get(admin_users_version)
+    def get(self):
         try:
             # Pagination parameters
             page = request.args.get('page', 1, type=int)
@@ -93,10 +76,28 @@ class AdminUsers(Resource):
                 )
 
             # Paginate results
-            users_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                users_page = keyset_paginate(
+                    query, [User.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int)
+                )
+                users, pagination = users_page.items, users_page.to_dict()
+            else:
+                users_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                users = users_paginated.items
+                pagination = {
+                    'page': users_paginated.page,
+                    'per_page': users_paginated.per_page,
+                    'total': users_paginated.total,
+                    'pages': users_paginated.pages,
+                    'has_next': users_paginated.has_next,
+                    'has_prev': users_paginated.has_prev
+                }
+
             users_data = []
 
-            for user in users_paginated.items:
+            for user in users:
                 user_data = user_schema.dump(user)
 
                 # Add role-specific profile data
@@ -113,22 +114,17 @@ class AdminUsers(Resource):
 
             return {
                 'users': users_data,
-                'pagination': {
-                    'page': users_paginated.page,
-                    'per_page': users_paginated.per_page,
-                    'total': users_paginated.total,
-                    'pages': users_paginated.pages,
-                    'has_next': users_paginated.has_next,
-                    'has_prev': users_paginated.has_prev
-                }
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch users: {str(e)}'}, 500
 
 class AdminUserUpdate(Resource):
     @role_required('admin')
-    def patch(self, user, user_id):
+    def patch(self, user_id):
         try:
             target_user = User.query.get(user_id)
             if not target_user:
@@ -140,14 +136,18 @@ class AdminUserUpdate(Resource):
             args = parser.parse_args()
 
             # Update user fields
-            if args.get('role'):
+            if args.get('role') and args['role'] != target_user.role:
+                record_user_role_change(target_user.role, args['role'])
                 target_user.role = args['role']
+                # Tokens carry the role, so outstanding ones must be revoked
+                target_user.token_version = (target_user.token_version or 0) + 1
             if args.get('is_active') is not None:
                 # Assuming we add an is_active field to User model
                 if hasattr(target_user, 'is_active'):
                     target_user.is_active = args['is_active']
 
             db.session.commit()
+            invalidate_auth_cache(target_user.id)
 
             return {
                 'message': 'User updated successfully',
@@ -164,7 +164,7 @@ class AdminUserUpdate(Resource):
 
 class AdminBookings(Resource):
     @role_required('admin')
-    def get(self, user):
+    def get(self):
         try:
             # Pagination parameters
             page = request.args.get('page', 1, type=int)
@@ -225,7 +225,7 @@ class AdminBookings(Resource):
 
 class AdminGuides(Resource):
     @role_required('admin')
-    def get(self, user):
+    def get(self):
         try:
             # Pagination parameters
             page = request.args.get('page', 1, type=int)
@@ -246,6 +246,8 @@ class AdminGuides(Resource):
             # Paginate results
             guides_paginated = guides_query.paginate(page=page, per_page=per_page, error_out=False)
             guides_data = []
+            # Booking counts for the whole page in one grouped query
+            booking_counts = count_grouped(Booking.guide_id, [guide.id for guide, _ in guides_paginated.items])
 
             for guide, user in guides_paginated.items:
                 guide_data = guide_schema.dump(guide)
@@ -257,9 +259,7 @@ class AdminGuides(Resource):
                     'approval_status': getattr(guide, 'approval_status', 'pending')  # Default to pending if not set
                 })
 
-                # Get booking count for this guide
-                booking_count = Booking.query.filter_by(guide_id=guide.id).count()
-                guide_data['total_bookings'] = booking_count
+                guide_data['total_bookings'] = booking_counts[guide.id]
 
                 guides_data.append(guide_data)
 
@@ -5,11 +5,12 @@ from models.traveler import Traveler
 from models.guide import Guide
 from utils.db import db
 from utils.jwt_service import create_token, token_required
-from schemas import UserSchema, TravelerSchema, GuideSchema
+from utils.dashboard_stats import record_user_role_change
+from schemas import UserSchema, TravelerSchema, GuideSchema, CompiledSchema
 
-user_schema = UserSchema()
-traveler_schema = TravelerSchema()
-guide_schema = GuideSchema()
+user_schema = CompiledSchema(UserSchema)
+traveler_schema = CompiledSchema(TravelerSchema)
+guide_schema = CompiledSchema(GuideSchema)
 
 class UserRegistration(Resource):
     def post(self):
@@ -35,20 +36,23 @@ class UserRegistration(Resource):
             new_user.set_password(args['password'])
 
             db.session.add(new_user)
+            record_user_role_change(None, new_user.role)
             db.session.commit()
 
             # Create role-specific profile
+            profile = None
             if args['role'].lower() == 'traveler':
-                traveler = Traveler(user_id=new_user.id)
-                db.session.add(traveler)
+                profile = Traveler(user_id=new_user.id)
+                db.session.add(profile)
             elif args['role'].lower() == 'guide':
-                guide = Guide(user_id=new_user.id)
-                db.session.add(guide)
+                profile = Guide(user_id=new_user.id)
+                db.session.add(profile)
 
             db.session.commit()
 
             # Generate token
-            token = create_token(new_user.id, new_user.role)
+            token = create_token(new_user.id, new_user.role, profile.id if profile else None,
+                                 new_user.token_version)
 
             return {
                 'success': True,
@@ -79,19 +83,20 @@ class UserLogin(Resource):
             if not user or not user.check_password(args['password']):
                 return {'success': False, 'message': 'Invalid email or password'}, 401
 
-            # Generate token
-            token = create_token(user.id, user.role)
-
             # Get role-specific data
             user_data = user_schema.dump(user)
+            profile = None
             if user.role == 'traveler':
-                traveler = Traveler.query.filter_by(user_id=user.id).first()
-                if traveler:
-                    user_data['traveler_profile'] = traveler_schema.dump(traveler)
+                profile = Traveler.query.filter_by(user_id=user.id).first()
+                if profile:
+                    user_data['traveler_profile'] = traveler_schema.dump(profile)
             elif user.role == 'guide':
-                guide = Guide.query.filter_by(user_id=user.id).first()
-                if guide:
-                    user_data['guide_profile'] = guide_schema.dump(guide)
+                profile = Guide.query.filter_by(user_id=user.id).first()
+                if profile:
+                    user_data['guide_profile'] = guide_schema.dump(profile)
+
+            # Generate token
+            token = create_token(user.id, user.role, profile.id if profile else None, user.token_version)
 
             return {
                 'success': True,
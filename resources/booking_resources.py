@@ -1,6 +1,7 @@
 from flask_restful import Resource, reqparse
 from flask import request
-from sqlalchemy import or_, and_
+from sqlalchemy import or_
+from sqlalchemy.orm import selectinload
 from datetime import datetime
 from utils.db import db
 from models.booking import Booking
@@ -8,40 +9,77 @@ from models.traveler import Traveler
 from models.guide import Guide
 from models.destination import Destination
 from models.user import User
-from schemas import BookingSchema, TravelerSchema, GuideSchema, DestinationSchema, UserSchema
+from schemas import BookingSchema, TravelerSchema, GuideSchema, DestinationSchema, UserSchema, CompiledSchema
 from utils.jwt_service import token_required
-from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError
-
-booking_schema = BookingSchema()
-traveler_schema = TravelerSchema()
-guide_schema = GuideSchema()
-destination_schema = DestinationSchema()
-user_schema = UserSchema()
+from utils.auth_context import get_auth_context
+from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError, ConflictError
+from utils.helpers import keyset_paginate
+from utils.dashboard_stats import record_booking_status_change
+from utils.response_cache import purge_cache_tags
+from utils.guide_availability import claim_guide_day, release_guide_day, sync_guide_day
+from utils.conditional_get import conditional_get, collection_version, row_version, latest_updates
+
+booking_schema = CompiledSchema(BookingSchema)
+traveler_schema = CompiledSchema(TravelerSchema)
+guide_schema = CompiledSchema(GuideSchema)
+destination_schema = CompiledSchema(DestinationSchema)
+user_schema = CompiledSchema(UserSchema)
+
+def with_serialization_relations(query):
+    """Eager-load everything _serialize_booking reads, so a page costs a fixed number of queries"""
+    return query.options(
+        selectinload(Booking.traveler).joinedload(Traveler.user),
+        selectinload(Booking.guide).joinedload(Guide.user),
+        selectinload(Booking.destination)
+    )
+
+def booking_list_version():
+    """Version of the caller's booking list; None when the handler should answer (e.g. missing profile)"""
+    auth = get_auth_context()
+    query = db.session.query(Booking)
+    if auth.role == 'traveler':
+        if not auth.traveler_id:
+            return None
+        query = query.filter(Booking.traveler_id == auth.traveler_id)
+    elif auth.role == 'guide':
+        if not auth.guide_id:
+            return None
+        query = query.filter(Booking.guide_id == auth.guide_id)
+    if request.args.get('status'):
+        query = query.filter(Booking.status == request.args.get('status'))
+    # Bookings embed traveler/guide names and destination details
+    return [collection_version(query, Booking), latest_updates(User, Destination)]
+
+def booking_detail_version(booking_id):
+    version = row_version(Booking, booking_id)
+    if version is None:
+        return None
+    return [version, latest_updates(User, Destination)]
 
 class BookingList(Resource):
     @token_required
-    def get(self, user):
+    @conditional_get(booking_list_version)
+    def get(self):
         try:
             # Pagination parameters
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
             status_filter = request.args.get('status')
 
-            # Build query based on user role
+            # Build query based on the caller's role (from the token claims, no users query)
             query = Booking.query
+            auth = get_auth_context()
 
-            if user.role == 'traveler':
+            if auth.role == 'traveler':
                 # Travelers can only see their own bookings
-                traveler = Traveler.query.filter_by(user_id=user.id).first()
-                if not traveler:
+                if not auth.traveler_id:
                     return {'error': 'Traveler profile not found'}, 404
-                query = query.filter(Booking.traveler_id == traveler.id)
-            elif user.role == 'guide':
+                query = query.filter(Booking.traveler_id == auth.traveler_id)
+            elif auth.role == 'guide':
                 # Guides can only see bookings assigned to them
-                guide = Guide.query.filter_by(user_id=user.id).first()
-                if not guide:
+                if not auth.guide_id:
                     return {'error': 'Guide profile not found'}, 404
-                query = query.filter(Booking.guide_id == guide.id)
+                query = query.filter(Booking.guide_id == auth.guide_id)
             # Admins can see all bookings (no filter needed)
 
             # Apply status filter if provided
@@ -51,17 +89,20 @@ class BookingList(Resource):
             # Order by creation date (most recent first)
             query = query.order_by(Booking.created_at.desc())
 
-            # Paginate results
-            bookings_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-            bookings_data = []
-
-            for booking in bookings_paginated.items:
-                booking_data = self._serialize_booking(booking)
-                bookings_data.append(booking_data)
+            # Paginate results, loading related rows for the whole page up front
+            query = with_serialization_relations(query)
 
-            return {
-                'bookings': bookings_data,
-                'pagination': {
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                bookings_page = keyset_paginate(
+                    query, [Booking.created_at, Booking.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int), descending=True
+                )
+                bookings, pagination = bookings_page.items, bookings_page.to_dict()
+            else:
+                bookings_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                bookings = bookings_paginated.items
+                pagination = {
                     'page': bookings_paginated.page,
                     'per_page': bookings_paginated.per_page,
                     'total': bookings_paginated.total,
@@ -69,20 +110,33 @@ class BookingList(Resource):
                     'has_next': bookings_paginated.has_next,
                     'has_prev': bookings_paginated.has_prev
                 }
+
+            bookings_data = []
+
+            for booking in bookings:
+                booking_data = BookingDetail._serialize_booking(booking)
+                bookings_data.append(booking_data)
+
+            return {
+                'bookings': bookings_data,
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch bookings: {str(e)}'}, 500
 
     @token_required
-    def post(self, user):
+    def post(self):
         try:
-            if user.role != 'traveler':
+            auth = get_auth_context()
+            if auth.role != 'traveler':
                 raise UnauthorizedError('Only travelers can create bookings')
 
             # Get traveler profile
-            traveler = Traveler.query.filter_by(user_id=user.id).first()
-            if not traveler:
+            traveler_id = auth.traveler_id
+            if not traveler_id:
                 return {'error': 'Traveler profile not found'}, 404
 
             parser = reqparse.RequestParser()
@@ -108,21 +162,9 @@ class BookingList(Resource):
             except ValueError:
                 raise ValidationError('Invalid date format. Use ISO format.')
 
-            # Check if guide is available on this date (basic check)
-            existing_booking = Booking.query.filter(
-                and_(
-                    Booking.guide_id == guide.id,
-                    Booking.date == booking_date.date(),
-                    Booking.status.in_(['pending', 'confirmed'])
-                )
-            ).first()
-
-            if existing_booking:
-                return {'error': 'Guide is not available on this date'}, 409
-
             # Create booking
             new_booking = Booking(
-                traveler_id=traveler.id,
+                traveler_id=traveler_id,
                 guide_id=guide.id,
                 destination_id=destination.id,
                 date=booking_date.date(),
@@ -131,11 +173,17 @@ class BookingList(Resource):
             )
 
             db.session.add(new_booking)
+            db.session.flush()
+            # Atomic availability check: the unique (guide_id, date) slot admits one booking per day
+            claim_guide_day(new_booking)
+            record_booking_status_change(None, new_booking.status)
             db.session.commit()
+            # Public guide pages show booking counts and availability
+            purge_cache_tags('guides', f'guide:{new_booking.guide_id}')
 
             return {
                 'message': 'Booking created successfully',
-                'booking': self._serialize_booking(new_booking)
+                'booking': BookingDetail._serialize_booking(new_booking)
             }, 201
 
         except ValidationError as e:
@@ -144,20 +192,24 @@ class BookingList(Resource):
             return {'error': str(e)}, 404
         except UnauthorizedError as e:
             return {'error': str(e)}, 403
+        except ConflictError as e:
+            db.session.rollback()
+            return {'error': str(e)}, 409
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to create booking: {str(e)}'}, 500
 
 class BookingDetail(Resource):
     @token_required
-    def get(self, user, booking_id):
+    @conditional_get(booking_detail_version)
+    def get(self, booking_id):
         try:
-            booking = Booking.query.get(booking_id)
+            booking = with_serialization_relations(Booking.query).get(booking_id)
             if not booking:
                 raise NotFoundError('Booking not found')
 
             # Check access permissions
-            if not self._can_access_booking(user, booking):
+            if not self._can_access_booking(booking):
                 raise UnauthorizedError('Access denied')
 
             return {'booking': self._serialize_booking(booking)}, 200
@@ -170,14 +222,14 @@ class BookingDetail(Resource):
             return {'error': f'Failed to fetch booking: {str(e)}'}, 500
 
     @token_required
-    def patch(self, user, booking_id):
+    def patch(self, booking_id):
         try:
             booking = Booking.query.get(booking_id)
             if not booking:
                 raise NotFoundError('Booking not found')
 
             # Check access permissions
-            if not self._can_access_booking(user, booking):
+            if not self._can_access_booking(booking):
                 raise UnauthorizedError('Access denied')
 
             parser = reqparse.RequestParser()
@@ -185,8 +237,11 @@ class BookingDetail(Resource):
             parser.add_argument('special_requests', type=str)
             args = parser.parse_args()
 
+            previous_status = booking.status
+
             # Update allowed fields based on role
-            if user.role == 'traveler':
+            role = get_auth_context().role
+            if role == 'traveler':
                 # Travelers can only update special requests and cancel
                 if args.get('status') and args['status'] not in ['cancelled']:
                     raise UnauthorizedError('Travelers can only cancel bookings')
@@ -194,12 +249,17 @@ class BookingDetail(Resource):
                     booking.special_requests = args['special_requests']
                 if args.get('status') == 'cancelled':
                     booking.status = 'cancelled'
-            elif user.role in ['guide', 'admin']:
+            elif role in ['guide', 'admin']:
                 # Guides and admins can update status
                 if args.get('status'):
                     booking.status = args['status']
 
+            # Cancelling frees the guide's day; reactivating has to win it back
+            sync_guide_day(booking, previous_status)
+            record_booking_status_change(previous_status, booking.status)
             db.session.commit()
+            if booking.guide_id and booking.status != previous_status:
+                purge_cache_tags(f'guide:{booking.guide_id}')
 
             return {
                 'message': 'Booking updated successfully',
@@ -212,19 +272,22 @@ class BookingDetail(Resource):
             return {'error': str(e)}, 404
         except UnauthorizedError as e:
             return {'error': str(e)}, 403
+        except ConflictError as e:
+            db.session.rollback()
+            return {'error': str(e)}, 409
         except Exception as e:
             db.session.rollback()
             return {'error': f'Failed to update booking: {str(e)}'}, 500
 
     @token_required
-    def delete(self, user, booking_id):
+    def delete(self, booking_id):
         try:
             booking = Booking.query.get(booking_id)
             if not booking:
                 raise NotFoundError('Booking not found')
 
             # Check access permissions
-            if not self._can_access_booking(user, booking):
+            if not self._can_access_booking(booking):
                 raise UnauthorizedError('Access denied')
 
             # Only allow deletion of pending bookings
@@ -232,11 +295,15 @@ class BookingDetail(Resource):
                 return {'error': 'Only pending bookings can be deleted'}, 400
 
             # Only travelers can delete their own bookings
-            if user.role != 'traveler':
+            if get_auth_context().role != 'traveler':
                 raise UnauthorizedError('Only travelers can delete bookings')
 
+            release_guide_day(booking)
             db.session.delete(booking)
+            record_booking_status_change(booking.status, None)
             db.session.commit()
+            if booking.guide_id:
+                purge_cache_tags('guides', f'guide:{booking.guide_id}')
 
             return {'message': 'Booking deleted successfully'}, 200
 
@@ -248,26 +315,27 @@ class BookingDetail(Resource):
             db.session.rollback()
             return {'error': f'Failed to delete booking: {str(e)}'}, 500
 
-    def _can_access_booking(self, user, booking):
+    def _can_access_booking(self, booking):
         """Check if user can access this booking"""
-        if user.role == 'admin':
+        # Authorized from the token claims; loading the users row here would cost a query
+        auth = get_auth_context()
+        if auth.role == 'admin':
             return True
-        elif user.role == 'traveler':
-            traveler = Traveler.query.filter_by(user_id=user.id).first()
-            return traveler and booking.traveler_id == traveler.id
-        elif user.role == 'guide':
-            guide = Guide.query.filter_by(user_id=user.id).first()
-            return guide and booking.guide_id == guide.id
+        elif auth.role == 'traveler':
+            return auth.traveler_id is not None and booking.traveler_id == auth.traveler_id
+        elif auth.role == 'guide':
+            return auth.guide_id is not None and booking.guide_id == auth.guide_id
         return False
 
-    def _serialize_booking(self, booking):
+    @staticmethod
+    def _serialize_booking(booking):
         """Serialize booking with related data"""
         booking_data = booking_schema.dump(booking)
 
         # Add traveler info
-        traveler = Traveler.query.get(booking.traveler_id)
+        traveler = booking.traveler
         if traveler:
-            traveler_user = User.query.get(traveler.user_id)
+            traveler_user = traveler.user
             booking_data['traveler'] = {
                 'id': traveler.id,
                 'user_id': traveler.user_id,
@@ -277,9 +345,9 @@ class BookingDetail(Resource):
 
         # Add guide info
         if booking.guide_id:
-            guide = Guide.query.get(booking.guide_id)
+            guide = booking.guide
             if guide:
-                guide_user = User.query.get(guide.user_id)
+                guide_user = guide.user
                 booking_data['guide'] = {
                     'id': guide.id,
                     'user_id': guide.user_id,
@@ -288,7 +356,7 @@ class BookingDetail(Resource):
                 }
 
         # Add destination info
-        destination = Destination.query.get(booking.destination_id)
+        destination = booking.destination
         if destination:
             booking_data['destination'] = destination_schema.dump(destination)
 
@@ -1,15 +1,34 @@
 from flask_restful import Resource, reqparse
 from flask import request
-from sqlalchemy import or_, and_
+from sqlalchemy import and_
 from utils.db import db
 from models.destination import Destination
-from schemas import DestinationSchema
+from schemas import DestinationSchema, CompiledSchema
 from utils.jwt_service import token_required, role_required
 from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError
-
-destination_schema = DestinationSchema()
+from utils.helpers import keyset_paginate, json_array
+from utils.dashboard_stats import record_destination_count_change
+from utils.destination_search import search_destinations, filter_by_amenities
+from utils.image_variants import refresh_destination_variants, get_destination_variants
+from utils.response_cache import cached_response, purge_cache_tags
+
+destination_schema = CompiledSchema(DestinationSchema)
+
+def serialize_destination(destination):
+    """Dump a destination with its responsive image variants decoded"""
+    destination_data = destination_schema.dump(destination)
+    destination_data['image_variants'] = get_destination_variants(destination)
+    return destination_data
+
+def destination_detail_tags(payload, destination_id):
+    tags = [f'destination:{destination_id}']
+    assigned_guide = payload['destination'].get('assigned_guide')
+    if assigned_guide:
+        tags.append(f"guide:{assigned_guide['id']}")
+    return tags
 
 class DestinationList(Resource):
+    @cached_response(tags=lambda payload: ['destinations'])
     def get(self):
         """Get all destinations (public access)"""
         try:
@@ -23,6 +42,7 @@ class DestinationList(Resource):
             min_price = request.args.get('min_price', type=float)
             max_price = request.args.get('max_price', type=float)
             search = request.args.get('search')  # Search in name or description
+            amenities = request.args.getlist('amenity')  # Repeat to require several
 
             # Build query
             query = Destination.query
@@ -40,25 +60,28 @@ class DestinationList(Resource):
             if max_price is not None:
                 query = query.filter(Destination.price <= max_price)
 
-            if search:
-                query = query.filter(
-                    or_(
-                        Destination.name.ilike(f'%{search}%'),
-                        Destination.description.ilike(f'%{search}%'),
-                        Destination.country.ilike(f'%{search}%')
-                    )
-                )
+            if amenities:
+                query = filter_by_amenities(query, amenities)
 
-            # Order by name
-            query = query.order_by(Destination.name)
+            if search:
+                # Full-text match, best-ranked first (cursor mode re-sorts by name)
+                query = search_destinations(query, search)
+            else:
+                # Order by name
+                query = query.order_by(Destination.name)
 
             # Paginate results
-            destinations_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-            destinations_data = [destination_schema.dump(dest) for dest in destinations_paginated.items]
-
-            return {
-                'destinations': destinations_data,
-                'pagination': {
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                destinations_page = keyset_paginate(
+                    query, [Destination.name, Destination.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int)
+                )
+                destinations, pagination = destinations_page.items, destinations_page.to_dict()
+            else:
+                destinations_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                destinations = destinations_paginated.items
+                pagination = {
                     'page': destinations_paginated.page,
                     'per_page': destinations_paginated.per_page,
                     'total': destinations_paginated.total,
@@ -66,13 +89,21 @@ class DestinationList(Resource):
                     'has_next': destinations_paginated.has_next,
                     'has_prev': destinations_paginated.has_prev
                 }
+
+            destinations_data = [serialize_destination(dest) for dest in destinations]
+
+            return {
+                'destinations': destinations_data,
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch destinations: {str(e)}'}, 500
 
     @role_required('admin')
-    def post(self, user):
+    def post(self):
         """Create new destination (admin only)"""
         try:
             parser = reqparse.RequestParser()
@@ -85,10 +116,10 @@ class DestinationList(Resource):
                               choices=['popular', 'international'])
             parser.add_argument('guide_id', type=int)
             parser.add_argument('duration_days', type=int)
-            parser.add_argument('included_amenities', type=str)  # JSON string
+            parser.add_argument('included_amenities', type=json_array, location='json')
             parser.add_argument('itinerary', type=str)
             parser.add_argument('max_travelers', type=int)
-            parser.add_argument('images', type=str)  # JSON string
+            parser.add_argument('images', type=json_array, location='json')
             args = parser.parse_args()
 
             # Check if destination with same name already exists
@@ -111,13 +142,16 @@ class DestinationList(Resource):
                 max_travelers=args.get('max_travelers'),
                 images=args.get('images')
             )
+            refresh_destination_variants(new_destination)
 
             db.session.add(new_destination)
+            record_destination_count_change(1)
             db.session.commit()
+            purge_cache_tags('destinations')
 
             return {
                 'message': 'Destination created successfully',
-                'destination': destination_schema.dump(new_destination)
+                'destination': serialize_destination(new_destination)
             }, 201
 
         except ValidationError as e:
@@ -127,6 +161,7 @@ class DestinationList(Resource):
             return {'error': f'Failed to create destination: {str(e)}'}, 500
 
 class DestinationDetail(Resource):
+    @cached_response(tags=destination_detail_tags)
     def get(self, destination_id):
         """Get specific destination with comprehensive data (public access)"""
         try:
@@ -135,7 +170,7 @@ class DestinationDetail(Resource):
                 raise NotFoundError('Destination not found')
 
             # Get comprehensive destination data
-            destination_data = destination_schema.dump(destination)
+            destination_data = serialize_destination(destination)
 
             # Add assigned guide information if exists
             if destination.assigned_guide:
@@ -150,20 +185,6 @@ class DestinationDetail(Resource):
                     'hourly_rate': destination.assigned_guide.hourly_rate
                 }
 
-            # Parse JSON fields
-            import json
-            if destination.included_amenities:
-                try:
-                    destination_data['included_amenities'] = json.loads(destination.included_amenities)
-                except:
-                    destination_data['included_amenities'] = []
-
-            if destination.images:
-                try:
-                    destination_data['images'] = json.loads(destination.images)
-                except:
-                    destination_data['images'] = []
-
             return {'destination': destination_data}, 200
 
         except NotFoundError as e:
@@ -172,7 +193,7 @@ class DestinationDetail(Resource):
             return {'error': f'Failed to fetch destination: {str(e)}'}, 500
 
     @role_required('admin')
-    def patch(self, user, destination_id):
+    def patch(self, destination_id):
         """Update destination (admin only)"""
         try:
             destination = Destination.query.get(destination_id)
@@ -188,10 +209,10 @@ class DestinationDetail(Resource):
             parser.add_argument('category', type=str, choices=['popular', 'international'])
             parser.add_argument('guide_id', type=int)
             parser.add_argument('duration_days', type=int)
-            parser.add_argument('included_amenities', type=str)  # JSON string
+            parser.add_argument('included_amenities', type=json_array, location='json')
             parser.add_argument('itinerary', type=str)
             parser.add_argument('max_travelers', type=int)
-            parser.add_argument('images', type=str)  # JSON string
+            parser.add_argument('images', type=json_array, location='json')
             args = parser.parse_args()
 
             # Update fields if provided
@@ -227,11 +248,15 @@ class DestinationDetail(Resource):
             if args.get('images') is not None:
                 destination.images = args['images']
 
+            if args.get('image_url') or args.get('images') is not None:
+                refresh_destination_variants(destination)
+
             db.session.commit()
+            purge_cache_tags('destinations', f'destination:{destination_id}')
 
             return {
                 'message': 'Destination updated successfully',
-                'destination': destination_schema.dump(destination)
+                'destination': serialize_destination(destination)
             }, 200
 
         except ValidationError as e:
@@ -243,7 +268,7 @@ class DestinationDetail(Resource):
             return {'error': f'Failed to update destination: {str(e)}'}, 500
 
     @role_required('admin')
-    def delete(self, user, destination_id):
+    def delete(self, destination_id):
         """Delete destination (admin only)"""
         try:
             destination = Destination.query.get(destination_id)
@@ -263,7 +288,9 @@ class DestinationDetail(Resource):
                 return {'error': 'Cannot delete destination with active bookings'}, 409
 
             db.session.delete(destination)
+            record_destination_count_change(-1)
             db.session.commit()
+            purge_cache_tags('destinations', f'destination:{destination_id}')
 
             return {'message': 'Destination deleted successfully'}, 200
 
@@ -2,18 +2,23 @@ from flask_restful import Resource, reqparse
 from flask import request
 from sqlalchemy import or_, and_
 from utils.db import db
-from models.guide import Guide
+from models.guide import Guide, GuideLanguage, GuideSpecialty, split_tags
 from models.user import User
 from models.booking import Booking
-from schemas import GuideSchema, UserSchema, BookingSchema
+from schemas import GuideSchema, UserSchema, BookingSchema, CompiledSchema
 from utils.jwt_service import token_required, role_required
+from utils.auth_context import get_auth_context, invalidate_auth_cache
 from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError
+from utils.helpers import keyset_paginate, count_grouped, ids_having_all
+from utils.response_cache import cached_response, purge_cache_tags
+from utils.guide_availability import get_guide_availability, parse_date_range, available_guides_query
 
-guide_schema = GuideSchema()
-user_schema = UserSchema()
-booking_schema = BookingSchema()
+guide_schema = CompiledSchema(GuideSchema)
+user_schema = CompiledSchema(UserSchema)
+booking_schema = CompiledSchema(BookingSchema)
 
 class GuideList(Resource):
+    @cached_response(tags=lambda payload: ['guides'])
     def get(self):
         """Get all guides (public access with filtering)"""
         try:
@@ -23,7 +28,8 @@ class GuideList(Resource):
 
             # Filtering parameters
             available_only = request.args.get('available', type=bool)
-            languages = request.args.get('languages')  # Comma-separated languages
+            languages = split_tags(request.args.get('languages'))  # Comma-separated languages
+            specialties = split_tags(request.args.get('specialties'))
             search = request.args.get('search')  # Search in bio or user name
 
             # Build query with user join
@@ -33,10 +39,16 @@ class GuideList(Resource):
             if available_only:
                 query = query.filter(Guide.is_available == True)
 
+            # Guides speaking every requested language, matched on whole names through the normalized tables
             if languages:
-                language_list = [lang.strip() for lang in languages.split(',')]
-                for lang in language_list:
-                    query = query.filter(Guide.languages.ilike(f'%{lang}%'))
+                query = query.filter(Guide.id.in_(
+                    ids_having_all(GuideLanguage.guide_id, GuideLanguage.language, languages)
+                ))
+
+            if specialties:
+                query = query.filter(Guide.id.in_(
+                    ids_having_all(GuideSpecialty.guide_id, GuideSpecialty.specialty, specialties)
+                ))
 
             if search:
                 query = query.filter(
@@ -50,10 +62,30 @@ class GuideList(Resource):
             query = query.order_by(User.full_name)
 
             # Paginate results
-            guides_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                guides_page = keyset_paginate(
+                    query, [User.full_name, Guide.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int)
+                )
+                guide_rows, pagination = guides_page.items, guides_page.to_dict()
+            else:
+                guides_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                guide_rows = guides_paginated.items
+                pagination = {
+                    'page': guides_paginated.page,
+                    'per_page': guides_paginated.per_page,
+                    'total': guides_paginated.total,
+                    'pages': guides_paginated.pages,
+                    'has_next': guides_paginated.has_next,
+                    'has_prev': guides_paginated.has_prev
+                }
+
             guides_data = []
+            # Booking counts for the whole page in one grouped query
+            booking_counts = count_grouped(Booking.guide_id, [guide.id for guide, _ in guide_rows])
 
-            for guide, user in guides_paginated.items:
+            for guide, user in guide_rows:
                 guide_data = guide_schema.dump(guide)
                 guide_data.update({
                     'user_info': {
@@ -64,36 +96,30 @@ class GuideList(Resource):
                     }
                 })
 
-                # Get booking count for this guide
-                booking_count = Booking.query.filter_by(guide_id=guide.id).count()
-                guide_data['total_bookings'] = booking_count
+                guide_data['total_bookings'] = booking_counts[guide.id]
 
                 guides_data.append(guide_data)
 
             return {
                 'guides': guides_data,
-                'pagination': {
-                    'page': guides_paginated.page,
-                    'per_page': guides_paginated.per_page,
-                    'total': guides_paginated.total,
-                    'pages': guides_paginated.pages,
-                    'has_next': guides_paginated.has_next,
-                    'has_prev': guides_paginated.has_prev
-                }
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch guides: {str(e)}'}, 500
 
     @token_required
-    def post(self, user):
+    def post(self):
         """Create or update guide profile (guides only)"""
         try:
-            if user.role != 'guide':
+            auth = get_auth_context()
+            if auth.role != 'guide':
                 raise UnauthorizedError('Only guides can create/update guide profiles')
 
             # Check if guide profile already exists
-            existing_guide = Guide.query.filter_by(user_id=user.id).first()
+            existing_guide = Guide.query.filter_by(user_id=auth.user_id).first()
 
             parser = reqparse.RequestParser()
             parser.add_argument('experience_years', type=int)
@@ -123,6 +149,7 @@ class GuideList(Resource):
                     existing_guide.license_number = args['license_number']
 
                 db.session.commit()
+                purge_cache_tags('guides', f'guide:{existing_guide.id}')
 
                 return {
                     'message': 'Guide profile updated successfully',
@@ -131,7 +158,7 @@ class GuideList(Resource):
             else:
                 # Create new profile
                 new_guide = Guide(
-                    user_id=user.id,
+                    user_id=auth.user_id,
                     experience_years=args.get('experience_years'),
                     languages=args.get('languages'),
                     bio=args.get('bio'),
@@ -143,6 +170,8 @@ class GuideList(Resource):
 
                 db.session.add(new_guide)
                 db.session.commit()
+                invalidate_auth_cache(auth.user_id)
+                purge_cache_tags('guides')
 
                 return {
                     'message': 'Guide profile created successfully',
@@ -158,6 +187,7 @@ class GuideList(Resource):
             return {'error': f'Failed to save guide profile: {str(e)}'}, 500
 
 class GuideDetail(Resource):
+    @cached_response(tags=lambda payload, guide_id: [f'guide:{guide_id}'])
     def get(self, guide_id):
         """Get specific guide profile (public access)"""
         try:
@@ -198,7 +228,7 @@ class GuideDetail(Resource):
             return {'error': f'Failed to fetch guide: {str(e)}'}, 500
 
     @token_required
-    def patch(self, user, guide_id):
+    def patch(self, guide_id):
         """Update guide profile (guide owner or admin only)"""
         try:
             guide = Guide.query.get(guide_id)
@@ -206,7 +236,8 @@ class GuideDetail(Resource):
                 raise NotFoundError('Guide not found')
 
             # Check permissions
-            if user.role != 'admin' and guide.user_id != user.id:
+            auth = get_auth_context()
+            if auth.role != 'admin' and guide.user_id != auth.user_id:
                 raise UnauthorizedError('Access denied')
 
             parser = reqparse.RequestParser()
@@ -236,6 +267,7 @@ class GuideDetail(Resource):
                 guide.license_number = args['license_number']
 
             db.session.commit()
+            purge_cache_tags('guides', f'guide:{guide_id}')
 
             return {
                 'message': 'Guide profile updated successfully',
@@ -254,7 +286,7 @@ class GuideDetail(Resource):
 
 class GuideBookings(Resource):
     @token_required
-    def get(self, user, guide_id):
+    def get(self, guide_id):
         """Get guide's bookings (guide owner or admin only)"""
         try:
             guide = Guide.query.get(guide_id)
@@ -262,7 +294,8 @@ class GuideBookings(Resource):
                 raise NotFoundError('Guide not found')
 
             # Check permissions
-            if user.role != 'admin' and guide.user_id != user.id:
+            auth = get_auth_context()
+            if auth.role != 'admin' and guide.user_id != auth.user_id:
                 raise UnauthorizedError('Access denied')
 
             # Pagination parameters
@@ -335,4 +368,73 @@ class GuideBookings(Resource):
                 'price': destination.price
             }
 
-        return booking_data
\ No newline at end of file
+        return booking_data
+
+
+class GuideAvailability(Resource):
+    @cached_response(tags=lambda payload, guide_id: [f'guide:{guide_id}'])
+    def get(self, guide_id):
+        """Day-by-day availability for ?from=&to= (ISO dates, default the next 30 days; public access)"""
+        try:
+            if not db.session.query(Guide.id).filter(Guide.id == guide_id).scalar():
+                raise NotFoundError('Guide not found')
+
+            start, end = parse_date_range(request.args, default_days=30)
+
+            return {
+                'guide_id': guide_id,
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'days': get_guide_availability(guide_id, start, end)
+            }, 200
+
+        except ValidationError as e:
+            return {'error': str(e)}, 400
+        except NotFoundError as e:
+            return {'error': str(e)}, 404
+        except Exception as e:
+            return {'error': f'Failed to fetch guide availability: {str(e)}'}, 500
+
+class AvailableGuides(Resource):
+    def get(self):
+        """Guides free on every day of ?from=&to=, optionally filtered by ?destination_id=, ?languages= and ?specialties= (public access)"""
+        try:
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 10, type=int)
+            start, end = parse_date_range(request.args, default_days=0)
+            query = available_guides_query(
+                start, end,
+                destination_id=request.args.get('destination_id', type=int),
+                languages=split_tags(request.args.get('languages')),  # Comma-separated languages
+                specialties=split_tags(request.args.get('specialties'))
+            )
+            guides_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+
+            guides_data = []
+            for guide, user in guides_paginated.items:
+                guide_data = guide_schema.dump(guide)
+                guide_data['user_info'] = {
+                    'id': user.id,
+                    'full_name': user.full_name,
+                    'profile_image_url': user.profile_image_url
+                }
+                guides_data.append(guide_data)
+
+            return {
+                'from': start.isoformat(),
+                'to': end.isoformat(),
+                'guides': guides_data,
+                'pagination': {
+                    'page': guides_paginated.page,
+                    'per_page': guides_paginated.per_page,
+                    'total': guides_paginated.total,
+                    'pages': guides_paginated.pages,
+                    'has_next': guides_paginated.has_next,
+                    'has_prev': guides_paginated.has_prev
+                }
+            }, 200
+
+        except ValidationError as e:
+            return {'error': str(e)}, 400
+        except Exception as e:
+            return {'error': f'Failed to search available guides: {str(e)}'}, 500
@@ -1,24 +1,86 @@
 from flask_restful import Resource, reqparse
-from flask import request
+from flask import request, current_app
 from sqlalchemy import or_, and_
 from utils.db import db
 from models.payment import Payment
 from models.booking import Booking
 from models.user import User
-from models.traveler import Traveler
-from schemas import PaymentSchema, BookingSchema
+from models.guide import Guide
+from models.destination import Destination
+from schemas import PaymentSchema, BookingSchema, CompiledSchema
 from utils.jwt_service import token_required
-from utils.paystack_service import PayStackService  # Updated import
+from utils.auth_context import get_auth_context
+from utils.paystack_service import paystack_service
 from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError
+from utils.helpers import keyset_paginate
+from utils.dashboard_stats import record_payment_status_change, record_booking_status_change
+from utils.background import background_tasks
+from utils.conditional_get import conditional_get, collection_version, row_version, latest_updates
 import uuid
 
-payment_schema = PaymentSchema()
-booking_schema = BookingSchema()
-paystack_service = PayStackService()  # Initialize PayStack service
+payment_schema = CompiledSchema(PaymentSchema)
+booking_schema = CompiledSchema(BookingSchema)
+
+def initialize_payment(payment_id, email, callback_url):
+    """Initialize the PayStack transaction for a pending payment and store its checkout details.
+
+    Runs inline for synchronous requests and on background_tasks for async ones.
+    """
+    payment = Payment.query.get(payment_id)
+    if not payment or payment.status != 'pending':
+        return None
+
+    payment_result = paystack_service.initialize_transaction(
+        email=email,
+        amount=payment.amount,
+        reference=payment.transaction_id,
+        callback_url=callback_url
+    )
+
+    if payment_result['success']:
+        # Update payment with PayStack reference
+        payment.transaction_id = payment_result['reference']  # Use PayStack reference
+        payment.paystack_access_code = payment_result.get('access_code')
+        payment.authorization_url = payment_result['authorization_url']
+    else:
+        payment.status = 'failed'
+    db.session.commit()
+
+    return payment_result
+
+def wants_async_initialization():
+    """Clients opt in with `Prefer: respond-async`; PAYMENT_INIT_ASYNC makes it the default"""
+    prefer = request.headers.get('Prefer', '')
+    return 'respond-async' in prefer.lower() or current_app.config.get('PAYMENT_INIT_ASYNC', False)
+
+def payment_list_version():
+    """Version of the caller's payment list; None when the handler should answer (e.g. missing profile)"""
+    auth = get_auth_context()
+    query = db.session.query(Payment)
+    if auth.role in ('traveler', 'guide'):
+        profile_id = auth.traveler_id if auth.role == 'traveler' else auth.guide_id
+        if not profile_id:
+            return None
+        owner = Booking.traveler_id if auth.role == 'traveler' else Booking.guide_id
+        query = query.filter(Payment.booking_id.in_(db.session.query(Booking.id).filter(owner == profile_id)))
+    if request.args.get('status'):
+        query = query.filter(Payment.status == request.args.get('status'))
+    # Payments embed booking status, destination and guide details
+    return [collection_version(query, Payment), latest_updates(Booking, Destination, Guide, User)]
+
+def payment_detail_version(payment_id):
+    version = row_version(Payment, payment_id)
+    if version is None:
+        return None
+    return [version, latest_updates(Booking, Destination, Guide, User)]
+
+def payment_authorization_version(payment_id):
+    return row_version(Payment, payment_id)
 
 class PaymentList(Resource):
     @token_required
-    def get(self, user):
+    @conditional_get(payment_list_version)
+    def get(self):
         """Get payments with role-based access"""
         try:
             # Pagination parameters
@@ -26,25 +88,24 @@ class PaymentList(Resource):
             per_page = request.args.get('per_page', 10, type=int)
             status_filter = request.args.get('status')
 
-            # Build query based on user role
+            # Build query based on the caller's role (from the token claims, no users query)
             query = Payment.query
 
-            if user.role == 'traveler':
+            auth = get_auth_context()
+
+            if auth.role == 'traveler':
                 # Travelers can only see payments for their bookings
-                traveler = Traveler.query.filter_by(user_id=user.id).first()
-                if not traveler:
+                if not auth.traveler_id:
                     return {'error': 'Traveler profile not found'}, 404
                 # Get booking IDs for this traveler
-                traveler_booking_ids = db.session.query(Booking.id).filter(Booking.traveler_id == traveler.id).subquery()
+                traveler_booking_ids = db.session.query(Booking.id).filter(Booking.traveler_id == auth.traveler_id).subquery()
                 query = query.filter(Payment.booking_id.in_(traveler_booking_ids))
-            elif user.role == 'guide':
+            elif auth.role == 'guide':
                 # Guides can see payments for bookings assigned to them
-                from models.guide import Guide
-                guide = Guide.query.filter_by(user_id=user.id).first()
-                if not guide:
+                if not auth.guide_id:
                     return {'error': 'Guide profile not found'}, 404
                 # Get booking IDs for this guide
-                guide_booking_ids = db.session.query(Booking.id).filter(Booking.guide_id == guide.id).subquery()
+                guide_booking_ids = db.session.query(Booking.id).filter(Booking.guide_id == auth.guide_id).subquery()
                 query = query.filter(Payment.booking_id.in_(guide_booking_ids))
             # Admins can see all payments (no filter needed)
 
@@ -56,16 +117,17 @@ class PaymentList(Resource):
             query = query.order_by(Payment.created_at.desc())
 
             # Paginate results
-            payments_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
-            payments_data = []
-
-            for payment in payments_paginated.items:
-                payment_data = self._serialize_payment(payment)
-                payments_data.append(payment_data)
-
-            return {
-                'payments': payments_data,
-                'pagination': {
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                payments_page = keyset_paginate(
+                    query, [Payment.created_at, Payment.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int), descending=True
+                )
+                payments, pagination = payments_page.items, payments_page.to_dict()
+            else:
+                payments_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                payments = payments_paginated.items
+                pagination = {
                     'page': payments_paginated.page,
                     'per_page': payments_paginated.per_page,
                     'total': payments_paginated.total,
@@ -73,16 +135,29 @@ class PaymentList(Resource):
                     'has_next': payments_paginated.has_next,
                     'has_prev': payments_paginated.has_prev
                 }
+
+            payments_data = []
+
+            for payment in payments:
+                payment_data = self._serialize_payment(payment)
+                payments_data.append(payment_data)
+
+            return {
+                'payments': payments_data,
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch payments: {str(e)}'}, 500
 
     @token_required
-    def post(self, user):
+    def post(self):
         """Create payment record and initiate PayStack payment"""
         try:
-            if user.role != 'traveler':
+            auth = get_auth_context()
+            if auth.role != 'traveler':
                 raise UnauthorizedError('Only travelers can initiate payments')
 
             parser = reqparse.RequestParser()
@@ -97,11 +172,11 @@ class PaymentList(Resource):
             if not booking:
                 raise NotFoundError('Booking not found')
 
-            traveler = Traveler.query.filter_by(user_id=user.id).first()
-            if not traveler:
+            traveler_id = auth.traveler_id
+            if not traveler_id:
                 raise NotFoundError('Traveler profile not found')
                 
-            if booking.traveler_id != traveler.id:
+            if booking.traveler_id != traveler_id:
                 raise UnauthorizedError('Access denied')
 
             # Check if booking already has a completed payment
@@ -126,19 +201,22 @@ class PaymentList(Resource):
             db.session.add(new_payment)
             db.session.commit()
 
+            # PayStack needs the email, the only place this request loads the users row
+            email = auth.user.email
+
+            if wants_async_initialization():
+                # Return the pending payment now; the client polls for the authorization URL
+                background_tasks.submit(initialize_payment, new_payment.id, email, args['callback_url'])
+                return {
+                    'message': 'Payment initialization started',
+                    'payment': payment_schema.dump(new_payment),
+                    'status_url': f'/api/payments/{new_payment.id}/authorization'
+                }, 202
+
             # Initialize payment with PayStack
-            payment_result = paystack_service.initialize_transaction(
-                email=user.email,
-                amount=args['amount'],
-                reference=transaction_id,
-                callback_url=args['callback_url']
-            )
+            payment_result = initialize_payment(new_payment.id, email, args['callback_url'])
 
             if payment_result['success']:
-                # Update payment with PayStack reference
-                new_payment.transaction_id = payment_result['reference']  # Use PayStack reference
-                db.session.commit()
-                
                 return {
                     'message': 'Payment initialized successfully',
                     'payment': self._serialize_payment(new_payment),
@@ -147,9 +225,6 @@ class PaymentList(Resource):
                     'access_code': payment_result.get('access_code', '')
                 }, 201
             else:
-                # Update payment status to failed
-                new_payment.status = 'failed'
-                db.session.commit()
                 return {'error': f'Payment initialization failed: {payment_result.get("message", "Unknown error")}'}, 500
 
         except ValidationError as e:
@@ -162,9 +237,43 @@ class PaymentList(Resource):
             db.session.rollback()
             return {'error': f'Failed to create payment: {str(e)}'}, 500
 
+class PaymentAuthorization(Resource):
+    @token_required
+    @conditional_get(payment_authorization_version)
+    def get(self, payment_id):
+        """Poll the PayStack checkout details of a payment initialized asynchronously"""
+        try:
+            payment = Payment.query.get(payment_id)
+            if not payment:
+                raise NotFoundError('Payment not found')
+
+            auth = get_auth_context()
+            if auth.role != 'admin':
+                booking = Booking.query.get(payment.booking_id)
+                if not booking or auth.traveler_id is None or booking.traveler_id != auth.traveler_id:
+                    raise UnauthorizedError('Access denied')
+
+            # Ready once PayStack returned a checkout URL; failed if initialization was rejected
+            return {
+                'payment_id': payment.id,
+                'status': payment.status,
+                'ready': payment.authorization_url is not None,
+                'authorization_url': payment.authorization_url,
+                'access_code': payment.paystack_access_code,
+                'reference': payment.transaction_id
+            }, 200
+
+        except NotFoundError as e:
+            return {'error': str(e)}, 404
+        except UnauthorizedError as e:
+            return {'error': str(e)}, 403
+        except Exception as e:
+            return {'error': f'Failed to fetch payment authorization: {str(e)}'}, 500
+
 class PaymentDetail(Resource):
     @token_required
-    def get(self, user, payment_id):
+    @conditional_get(payment_detail_version)
+    def get(self, payment_id):
         """Get specific payment details"""
         try:
             payment = Payment.query.get(payment_id)
@@ -172,7 +281,7 @@ class PaymentDetail(Resource):
                 raise NotFoundError('Payment not found')
 
             # Check access permissions
-            if not self._can_access_payment(user, payment):
+            if not self._can_access_payment(payment):
                 raise UnauthorizedError('Access denied')
 
             return {'payment': self._serialize_payment(payment)}, 200
@@ -185,7 +294,7 @@ class PaymentDetail(Resource):
             return {'error': f'Failed to fetch payment: {str(e)}'}, 500
 
     @token_required
-    def patch(self, user, payment_id):
+    def patch(self, payment_id):
         """Update payment status (typically called by payment webhook or admin)"""
         try:
             payment = Payment.query.get(payment_id)
@@ -193,7 +302,7 @@ class PaymentDetail(Resource):
                 raise NotFoundError('Payment not found')
 
             # Check access permissions (admins can update any payment)
-            if user.role != 'admin' and not self._can_access_payment(user, payment):
+            if get_auth_context().role != 'admin' and not self._can_access_payment(payment):
                 raise UnauthorizedError('Access denied')
 
             parser = reqparse.RequestParser()
@@ -203,6 +312,7 @@ class PaymentDetail(Resource):
             args = parser.parse_args()
 
             # Update payment
+            record_payment_status_change(payment, payment.status, args['status'])
             payment.status = args['status']
             if args.get('transaction_id'):
                 # Validate transaction ID uniqueness
@@ -218,6 +328,7 @@ class PaymentDetail(Resource):
                 booking = Booking.query.get(payment.booking_id)
                 if booking and booking.status == 'pending':
                     booking.status = 'confirmed'
+                    record_booking_status_change('pending', 'confirmed')
                     db.session.add(booking)
 
             db.session.commit()
@@ -269,16 +380,19 @@ class PaymentVerify(Resource):
                 # Update payment status based on PayStack response
                 paystack_status = verification_result['data']['status']
                 if paystack_status == 'success':
+                    record_payment_status_change(payment, payment.status, 'completed')
                     payment.status = 'completed'
                     
                     # Update booking status
                     booking = Booking.query.get(payment.booking_id)
                     if booking and booking.status == 'pending':
                         booking.status = 'confirmed'
+                        record_booking_status_change('pending', 'confirmed')
                         db.session.add(booking)
                         
                     message = 'Payment verified successfully'
                 else:
+                    record_payment_status_change(payment, payment.status, 'failed')
                     payment.status = 'failed'
                     message = f'Payment failed: {paystack_status}'
 
@@ -295,9 +409,11 @@ class PaymentVerify(Resource):
         except Exception as e:
             return {'error': f'Payment verification failed: {str(e)}'}, 500
 
-    def _can_access_payment(self, user, payment):
+    def _can_access_payment(self, payment):
         """Check if user can access this payment"""
-        if user.role == 'admin':
+        # Authorized from the token claims; loading the users row here would cost a query
+        auth = get_auth_context()
+        if auth.role == 'admin':
             return True
 
         # Get the booking for this payment
@@ -305,13 +421,10 @@ class PaymentVerify(Resource):
         if not booking:
             return False
 
-        if user.role == 'traveler':
-            traveler = Traveler.query.filter_by(user_id=user.id).first()
-            return traveler and booking.traveler_id == traveler.id
-        elif user.role == 'guide':
-            from models.guide import Guide
-            guide = Guide.query.filter_by(user_id=user.id).first()
-            return guide and booking.guide_id == guide.id
+        if auth.role == 'traveler':
+            return auth.traveler_id is not None and booking.traveler_id == auth.traveler_id
+        elif auth.role == 'guide':
+            return auth.guide_id is not None and booking.guide_id == auth.guide_id
 
         return False
 
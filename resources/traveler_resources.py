@@ -5,17 +5,32 @@ from utils.db import db
 from models.traveler import Traveler
 from models.user import User
 from models.booking import Booking
-from schemas import TravelerSchema, UserSchema, BookingSchema
+from schemas import TravelerSchema, UserSchema, BookingSchema, CompiledSchema
 from utils.jwt_service import token_required, role_required
+from utils.auth_context import get_auth_context, invalidate_auth_cache
 from utils.error_handlers import ValidationError, NotFoundError, UnauthorizedError
+from utils.helpers import keyset_paginate, count_grouped
+from utils.conditional_get import conditional_get, table_version, collection_version, latest_updates
 
-traveler_schema = TravelerSchema()
-user_schema = UserSchema()
-booking_schema = BookingSchema()
+traveler_schema = CompiledSchema(TravelerSchema)
+user_schema = CompiledSchema(UserSchema)
+booking_schema = CompiledSchema(BookingSchema)
+
+def traveler_list_version():
+    # Rows embed their user and a booking count
+    return [table_version(Traveler), latest_updates(User), table_version(Booking)]
+
+def traveler_detail_version(traveler_id):
+    versions = db.session.query(Traveler.updated_at, User.updated_at) \
+        .join(User, Traveler.user_id == User.id).filter(Traveler.id == traveler_id).first()
+    if versions is None:
+        return None
+    return [list(versions), collection_version(Booking.query.filter(Booking.traveler_id == traveler_id), Booking)]
 
 class TravelerList(Resource):
     @role_required('admin')
-    def get(self, user):
+    @conditional_get(traveler_list_version)
+    def get(self):
         """Get all travelers (admin only)"""
         try:
             # Pagination parameters
@@ -40,10 +55,30 @@ class TravelerList(Resource):
             query = query.order_by(User.full_name)
 
             # Paginate results
-            travelers_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+            if 'cursor' in request.args:
+                # Cursor mode skips OFFSET and COUNT(*) for infinite-scroll clients
+                travelers_page = keyset_paginate(
+                    query, [User.full_name, Traveler.id], request.args.get('cursor'),
+                    request.args.get('limit', per_page, type=int)
+                )
+                traveler_rows, pagination = travelers_page.items, travelers_page.to_dict()
+            else:
+                travelers_paginated = query.paginate(page=page, per_page=per_page, error_out=False)
+                traveler_rows = travelers_paginated.items
+                pagination = {
+                    'page': travelers_paginated.page,
+                    'per_page': travelers_paginated.per_page,
+                    'total': travelers_paginated.total,
+                    'pages': travelers_paginated.pages,
+                    'has_next': travelers_paginated.has_next,
+                    'has_prev': travelers_paginated.has_prev
+                }
+
             travelers_data = []
+            # Booking counts for the whole page in one grouped query
+            booking_counts = count_grouped(Booking.traveler_id, [traveler.id for traveler, _ in traveler_rows])
 
-            for traveler, user in travelers_paginated.items:
+            for traveler, user in traveler_rows:
                 traveler_data = traveler_schema.dump(traveler)
                 traveler_data.update({
                     'user_info': user_schema.dump(user),
@@ -52,36 +87,30 @@ class TravelerList(Resource):
                     'profile_image_url': user.profile_image_url
                 })
 
-                # Get booking count for this traveler
-                booking_count = Booking.query.filter_by(traveler_id=traveler.id).count()
-                traveler_data['total_bookings'] = booking_count
+                traveler_data['total_bookings'] = booking_counts[traveler.id]
 
                 travelers_data.append(traveler_data)
 
             return {
                 'travelers': travelers_data,
-                'pagination': {
-                    'page': travelers_paginated.page,
-                    'per_page': travelers_paginated.per_page,
-                    'total': travelers_paginated.total,
-                    'pages': travelers_paginated.pages,
-                    'has_next': travelers_paginated.has_next,
-                    'has_prev': travelers_paginated.has_prev
-                }
+                'pagination': pagination
             }, 200
 
+        except ValidationError as e:
+            return {'error': str(e)}, 400
         except Exception as e:
             return {'error': f'Failed to fetch travelers: {str(e)}'}, 500
 
     @token_required
-    def post(self, user):
+    def post(self):
         """Create or update traveler profile (travelers only)"""
         try:
-            if user.role != 'traveler':
+            auth = get_auth_context()
+            if auth.role != 'traveler':
                 raise UnauthorizedError('Only travelers can create/update traveler profiles')
 
             # Check if traveler profile already exists
-            existing_traveler = Traveler.query.filter_by(user_id=user.id).first()
+            existing_traveler = Traveler.query.filter_by(user_id=auth.user_id).first()
 
             parser = reqparse.RequestParser()
             parser.add_argument('nationality', type=str)
@@ -107,7 +136,7 @@ class TravelerList(Resource):
             else:
                 # Create new profile
                 new_traveler = Traveler(
-                    user_id=user.id,
+                    user_id=auth.user_id,
                     nationality=args.get('nationality'),
                     preferences=args.get('preferences'),
                     emergency_contact=args.get('emergency_contact')
@@ -115,6 +144,7 @@ class TravelerList(Resource):
 
                 db.session.add(new_traveler)
                 db.session.commit()
+                invalidate_auth_cache(auth.user_id)
 
                 return {
                     'message': 'Traveler profile created successfully',
@@ -131,7 +161,8 @@ class TravelerList(Resource):
 
 class TravelerDetail(Resource):
     @token_required
-    def get(self, user, traveler_id):
+    @conditional_get(traveler_detail_version)
+    def get(self, traveler_id):
         """Get specific traveler profile"""
         try:
             traveler = Traveler.query.get(traveler_id)
@@ -139,7 +170,8 @@ class TravelerDetail(Resource):
                 raise NotFoundError('Traveler not found')
 
             # Check permissions
-            if user.role != 'admin' and traveler.user_id != user.id:
+            auth = get_auth_context()
+            if auth.role != 'admin' and traveler.user_id != auth.user_id:
                 raise UnauthorizedError('Access denied')
 
             traveler_user = User.query.get(traveler.user_id)
@@ -181,7 +213,7 @@ class TravelerDetail(Resource):
             return {'error': f'Failed to fetch traveler: {str(e)}'}, 500
 
     @token_required
-    def patch(self, user, traveler_id):
+    def patch(self, traveler_id):
         """Update traveler profile (traveler owner or admin only)"""
         try:
             traveler = Traveler.query.get(traveler_id)
@@ -189,7 +221,8 @@ class TravelerDetail(Resource):
                 raise NotFoundError('Traveler not found')
 
             # Check permissions
-            if user.role != 'admin' and traveler.user_id != user.id:
+            auth = get_auth_context()
+            if auth.role != 'admin' and traveler.user_id != auth.user_id:
                 raise UnauthorizedError('Access denied')
 
             parser = reqparse.RequestParser()
@@ -225,7 +258,7 @@ class TravelerDetail(Resource):
 
 class TravelerBookings(Resource):
     @token_required
-    def get(self, user, traveler_id):
+    def get(self, traveler_id):
         """Get traveler's bookings (traveler owner or admin only)"""
         try:
             traveler = Traveler.query.get(traveler_id)
@@ -233,7 +266,8 @@ class TravelerBookings(Resource):
                 raise NotFoundError('Traveler not found')
 
             # Check permissions
-            if user.role != 'admin' and traveler.user_id != user.id:
+            auth = get_auth_context()
+            if auth.role != 'admin' and traveler.user_id != auth.user_id:
                 raise UnauthorizedError('Access denied')
 
             # Pagination parameters
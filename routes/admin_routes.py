@@ -3,6 +3,8 @@ from utils.db import db
 from models.admin import Admin
 from models.user import User
 from utils.jwt_service import role_required
+from utils.auth_context import invalidate_auth_cache
+from utils.dashboard_stats import get_dashboard_statistics, record_user_role_change
 
 admin_bp = Blueprint("admin_bp", __name__)
 
@@ -20,8 +22,13 @@ def assign_role():
     user = User.query.get(data.get("user_id"))
     if not user:
         return jsonify({"error": "User not found"}), 404
-    user.role = data.get("role")
+    if data.get("role") != user.role:
+        record_user_role_change(user.role, data.get("role"))
+        user.role = data.get("role")
+        # Tokens carry the role, so outstanding ones must be revoked
+        user.token_version = (user.token_version or 0) + 1
     db.session.commit()
+    invalidate_auth_cache(user.id)
     return jsonify({"message": f"User role updated to {user.role}"}), 200
 
 # Add these endpoints:
@@ -29,26 +36,14 @@ def assign_role():
 @role_required("admin")
 def get_dashboard_stats():
     try:
-        from models.user import User
-        from models.destination import Destination
-        from models.booking import Booking
-        from models.payment import Payment
-        
-        total_users = User.query.count()
-        total_destinations = Destination.query.count()
-        total_bookings = Booking.query.count()
-        active_bookings = Booking.query.filter_by(status='confirmed').count()
-        
-        total_revenue = db.session.query(db.func.sum(Payment.amount)).filter(
-            Payment.status == 'completed'
-        ).scalar() or 0
+        statistics = get_dashboard_statistics()
 
         return jsonify({
-            "totalUsers": total_users,
-            "totalDestinations": total_destinations,
-            "totalBookings": total_bookings,
-            "activeBookings": active_bookings,
-            "totalRevenue": float(total_revenue)
+            "totalUsers": statistics["total_users"],
+            "totalDestinations": statistics["total_destinations"],
+            "totalBookings": statistics["total_bookings"],
+            "activeBookings": statistics["active_bookings"],
+            "totalRevenue": statistics["total_revenue"]
         }), 200
         
     except Exception as e:
@@ -0,0 +1,167 @@
+import csv
+import io
+from datetime import date, time
+from flask import Blueprint, Response, request, stream_with_context, jsonify
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from utils.db import db
+from models.booking import Booking
+from models.payment import Payment
+from models.traveler import Traveler
+from models.guide import Guide
+from models.destination import Destination
+from models.user import User
+from utils.jwt_service import role_required
+from utils.json_encoding import dumps
+
+export_bp = Blueprint("export_bp", __name__)
+
+# Rows fetched per round trip from the server-side cursor, and rows per chunk written to the client
+FETCH_SIZE = 1000
+CHUNK_ROWS = 500
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+def bookings_export_query(status=None):
+    traveler_user = aliased(User)
+    guide_user = aliased(User)
+    query = select(
+        Booking.id,
+        Booking.date,
+        Booking.status,
+        Booking.created_at,
+        Booking.traveler_id,
+        traveler_user.full_name.label("traveler_name"),
+        traveler_user.email.label("traveler_email"),
+        Booking.guide_id,
+        guide_user.full_name.label("guide_name"),
+        Booking.destination_id,
+        Destination.name.label("destination_name")
+    ).join(Traveler, Booking.traveler_id == Traveler.id) \
+        .join(traveler_user, Traveler.user_id == traveler_user.id) \
+        .outerjoin(Guide, Booking.guide_id == Guide.id) \
+        .outerjoin(guide_user, Guide.user_id == guide_user.id) \
+        .outerjoin(Destination, Booking.destination_id == Destination.id)
+    if status:
+        query = query.where(Booking.status == status)
+    return query.order_by(Booking.id)
+
+def payments_export_query(status=None):
+    query = select(
+        Payment.id,
+        Payment.booking_id,
+        Payment.amount,
+        Payment.currency,
+        Payment.status,
+        Payment.payment_method,
+        Payment.transaction_id,
+        Payment.created_at,
+        Payment.updated_at,
+        User.full_name.label("traveler_name"),
+        User.email.label("traveler_email"),
+        Destination.name.label("destination_name")
+    ).join(Booking, Payment.booking_id == Booking.id) \
+        .join(Traveler, Booking.traveler_id == Traveler.id) \
+        .join(User, Traveler.user_id == User.id) \
+        .outerjoin(Destination, Booking.destination_id == Destination.id)
+    if status:
+        query = query.where(Payment.status == status)
+    return query.order_by(Payment.id)
+
+def users_export_query(role=None):
+    # Never export password hashes or token versions
+    query = select(
+        User.id,
+        User.full_name,
+        User.email,
+        User.role,
+        User.profile_image_url,
+        Traveler.id.label("traveler_id"),
+        Traveler.nationality,
+        Guide.id.label("guide_id"),
+        Guide.experience_years,
+        Guide.languages
+    ).outerjoin(Traveler, Traveler.user_id == User.id) \
+        .outerjoin(Guide, Guide.user_id == User.id)
+    if role:
+        query = query.where(User.role == role)
+    return query.order_by(User.id)
+
+EXPORTS = {
+    "bookings": (bookings_export_query, "status"),
+    "payments": (payments_export_query, "status"),
+    "users": (users_export_query, "role")
+}
+
+def _stream_rows(query):
+    """Plain row tuples from a server-side cursor (yield_per implies stream_results), so no ORM objects pile up"""
+    result = db.session.execute(query.execution_options(yield_per=FETCH_SIZE))
+    return result.keys(), result
+
+def _csv_value(value):
+    """A cell rendered as in the NDJSON export: ISO dates, JSON text for objects, lists and booleans"""
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, (dict, list, bool)):
+        return dumps(value)
+    return value
+
+def generate_ndjson(rows, columns):
+    lines = []
+    for row in rows:
+        lines.append(dumps(dict(zip(columns, row))))
+        if len(lines) >= CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+def generate_csv(rows, columns):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Header first so clients get bytes before the first fetch completes
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+@export_bp.route("/exports/<string:dataset>", methods=["GET"])
+@role_required("admin")
+def export_dataset(dataset):
+    """Stream a whole table with its joined names as NDJSON (default) or CSV (?format=csv)"""
+    if dataset not in EXPORTS:
+        return jsonify({"error": "Unknown export"}), 404
+
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    build_query, filter_arg = EXPORTS[dataset]
+    columns, rows = _stream_rows(build_query(request.args.get(filter_arg)))
+    columns = list(columns)
+
+    generate = generate_csv if export_format == "csv" else generate_ndjson
+    return Response(
+        stream_with_context(generate(rows, columns)),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={
+            "Content-Disposition": f"attachment; filename={dataset}.{export_format}",
+            # Keep reverse proxies from buffering the whole export
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -4,12 +4,13 @@ from utils.db import db
 from models.payment import Payment
 from models.booking import Booking
 from utils.jwt_service import token_required
+from utils.auth_context import get_auth_context
 
 payment_bp = Blueprint("payment_bp", __name__)
 
 @payment_bp.route("/initialize", methods=["POST"])
 @token_required
-def initialize_payment(current_user):
+def initialize_payment():
     try:
         data = request.get_json()
         
@@ -37,7 +38,7 @@ def initialize_payment(current_user):
             reference=payment.transaction_id,
             metadata={
                 'booking_id': data['booking_id'],
-                'user_id': current_user.id,
+                'user_id': get_auth_context().user_id,
                 'payment_id': payment.id
             }
         )
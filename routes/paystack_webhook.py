@@ -3,6 +3,8 @@ from utils.paystack_service import paystack_service
 from models.payment import Payment
 from models.booking import Booking
 from utils.db import db
+from utils.dashboard_stats import record_payment_status_change, record_booking_status_change
+from utils.webhook_events import record_webhook_event, schedule_webhook_processing
 import hmac
 import hashlib
 import os
@@ -11,7 +13,7 @@ paystack_bp = Blueprint('paystack', __name__)
 
 @paystack_bp.route('/webhook/paystack', methods=['POST'])
 def paystack_webhook():
-    """Handle PayStack webhook for payment verification"""
+    """Verify, log and acknowledge a PayStack webhook (see utils.webhook_events)"""
     try:
         # Get the raw request data
         payload = request.get_data()
@@ -34,42 +36,15 @@ def paystack_webhook():
             return jsonify({'error': 'Invalid signature'}), 401
 
         # Parse the webhook data
-        data = request.get_json()
-        event = data.get('event')
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid payload'}), 400
 
-        if event == 'charge.success':
-            # Payment was successful
-            payment_data = data.get('data', {})
-            reference = payment_data.get('reference')
-
-            if reference:
-                # Find and update the payment
-                payment = Payment.query.filter_by(transaction_id=reference).first()
-                if payment:
-                    payment.status = 'completed'
-
-                    # Update booking status to confirmed
-                    booking = Booking.query.get(payment.booking_id)
-                    if booking and booking.status == 'pending':
-                        booking.status = 'confirmed'
-
-                    db.session.commit()
-
-                    return jsonify({'status': 'success'}), 200
-
-        elif event == 'charge.failed':
-            # Payment failed
-            payment_data = data.get('data', {})
-            reference = payment_data.get('reference')
-
-            if reference:
-                payment = Payment.query.filter_by(transaction_id=reference).first()
-                if payment:
-                    payment.status = 'failed'
-                    db.session.commit()
-
-                    return jsonify({'status': 'failed payment updated'}), 200
+        # Log the delivery and acknowledge; state changes are applied by the background consumer
+        if not record_webhook_event(data, payload):
+            return jsonify({'status': 'duplicate event'}), 200
 
+        schedule_webhook_processing()
         return jsonify({'status': 'event received'}), 200
 
     except Exception as e:
@@ -88,13 +63,16 @@ def verify_payment(reference):
             payment = Payment.query.filter_by(transaction_id=reference).first()
             if payment:
                 paystack_data = result['data']
-                payment.status = 'completed' if paystack_data['status'] == 'success' else 'failed'
+                new_status = 'completed' if paystack_data['status'] == 'success' else 'failed'
+                record_payment_status_change(payment, payment.status, new_status)
+                payment.status = new_status
 
                 # Update booking if payment completed
                 if payment.status == 'completed':
                     booking = Booking.query.get(payment.booking_id)
                     if booking and booking.status == 'pending':
                         booking.status = 'confirmed'
+                        record_booking_status_change('pending', 'confirmed')
 
                 db.session.commit()
 
@@ -1,14 +1,39 @@
 from flask import Blueprint, request, jsonify
-from utils.cloudinary_service import upload_to_cloudinary
+from utils.cloudinary_service import upload_to_cloudinary, signed_upload_params, verify_direct_upload, stream_to_cloudinary
 from utils.db import db
 from models.user import User
 from utils.jwt_service import token_required
+from utils.auth_context import get_auth_context
+from utils.image_variants import variants_for_public_id, refresh_destination_variants
+from models.destination import Destination
+from utils.response_cache import purge_cache_tags
 
 upload_bp = Blueprint('upload_bp', __name__)
 
+UPLOAD_FOLDERS = {
+    'profile': "safarihub/profile_pictures",
+    'destination': "safarihub/destinations"
+}
+MAX_STREAM_UPLOAD_SIZE = 20 * 1024 * 1024
+
+def _check_upload_target(target, auth):
+    """Return an error response for unknown targets or non-admin destination uploads"""
+    if target not in UPLOAD_FOLDERS:
+        return jsonify({"error": "Unknown upload target"}), 404
+    if target == 'destination' and auth.role != 'admin':
+        return jsonify({"error": "Admin access required"}), 403
+    return None
+
+def _save_profile_image(auth, image_url):
+    """Store the caller's new profile image; guide listings embed it, so their cached pages are purged"""
+    auth.user.profile_image_url = image_url
+    db.session.commit()
+    if auth.guide_id:
+        purge_cache_tags('guides', f'guide:{auth.guide_id}')
+
 @upload_bp.route("/upload/profile", methods=["POST"])
 @token_required
-def upload_profile_image(current_user):
+def upload_profile_image():
     try:
         if 'image' not in request.files:
             return jsonify({"error": "No image file provided"}), 400
@@ -28,8 +53,7 @@ def upload_profile_image(current_user):
             return jsonify({"error": upload_result["error"]}), 500
 
         # Update user profile in database
-        current_user.profile_image_url = upload_result["url"]
-        db.session.commit()
+        _save_profile_image(get_auth_context(), upload_result["url"])
 
         return jsonify({
             "message": "Profile image uploaded successfully",
@@ -40,11 +64,26 @@ def upload_profile_image(current_user):
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
+def _attach_destination_image(upload_result):
+    """Variant URLs for an uploaded destination image; with a destination_id form/query
+    value the image also becomes that destination's main image.
+    """
+    variants = variants_for_public_id(upload_result["public_id"])
+    destination_id = request.values.get('destination_id', type=int)
+    if destination_id:
+        destination = Destination.query.get(destination_id)
+        if destination:
+            destination.image_url = upload_result["url"]
+            refresh_destination_variants(destination)
+            db.session.commit()
+            purge_cache_tags('destinations', f'destination:{destination_id}')
+    return variants
+
 @upload_bp.route("/upload/destination", methods=["POST"])
 @token_required
-def upload_destination_image(current_user):
+def upload_destination_image():
     try:
-        if current_user.role != 'admin':
+        if get_auth_context().role != 'admin':
             return jsonify({"error": "Admin access required"}), 403
 
         if 'image' not in request.files:
@@ -65,8 +104,103 @@ def upload_destination_image(current_user):
 
         return jsonify({
             "message": "Destination image uploaded successfully",
-            "image_url": upload_result["url"]
+            "image_url": upload_result["url"],
+            "image_variants": _attach_destination_image(upload_result)
+        }), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@upload_bp.route("/upload/<target>/signature", methods=["POST"])
+@token_required
+def create_upload_signature(target):
+    """Issue signed parameters so the client can upload directly to Cloudinary"""
+    try:
+        auth = get_auth_context()
+        error = _check_upload_target(target, auth)
+        if error:
+            return error
+
+        params = signed_upload_params(UPLOAD_FOLDERS[target], public_id_prefix=f"user_{auth.user_id}")
+        return jsonify(params), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@upload_bp.route("/upload/profile/complete", methods=["POST"])
+@token_required
+def complete_profile_upload():
+    """Persist a profile image the client uploaded directly to Cloudinary"""
+    try:
+        auth = get_auth_context()
+        data = request.get_json(silent=True) or {}
+        public_id = data.get('public_id')
+        version = data.get('version')
+        signature = data.get('signature')
+        if not (public_id and version and signature):
+            return jsonify({"error": "public_id, version and signature are required"}), 400
+
+        # Only accept uploads made with a signature issued to this user
+        if not public_id.startswith(f"{UPLOAD_FOLDERS['profile']}/user_{auth.user_id}_"):
+            return jsonify({"error": "Upload does not belong to this user"}), 403
+
+        image_url = verify_direct_upload(public_id, version, signature)
+        if not image_url:
+            return jsonify({"error": "Invalid upload signature"}), 400
+
+        _save_profile_image(auth, image_url)
+
+        return jsonify({
+            "message": "Profile image uploaded successfully",
+            "image_url": image_url
         }), 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
+
+@upload_bp.route("/upload/<target>/stream", methods=["POST"])
+@token_required
+def stream_upload(target):
+    """Fallback for clients that cannot upload directly: the raw request body is
+    piped to Cloudinary in chunks instead of being buffered as a multipart file.
+    """
+    try:
+        auth = get_auth_context()
+        error = _check_upload_target(target, auth)
+        if error:
+            return error
+
+        total_size = request.content_length
+        if not total_size:
+            return jsonify({"error": "Content-Length is required"}), 411
+        if total_size > MAX_STREAM_UPLOAD_SIZE:
+            return jsonify({"error": "Image is too large"}), 413
+        if not (request.mimetype or '').startswith('image/'):
+            return jsonify({"error": "Body must be an image"}), 415
+
+        upload_result = stream_to_cloudinary(
+            request.stream,
+            total_size,
+            folder=UPLOAD_FOLDERS[target],
+            filename=request.headers.get('X-Filename', 'upload')
+        )
+
+        if not upload_result["success"]:
+            return jsonify({"error": upload_result["error"]}), 500
+
+        response = {
+            "message": "Image uploaded successfully",
+            "image_url": upload_result["url"]
+        }
+        if target == 'profile':
+            _save_profile_image(auth, upload_result["url"])
+        else:
+            response["image_variants"] = _attach_destination_image(upload_result)
+
+        return jsonify(response), 200
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
@@ -1,5 +1,6 @@
 # schemas.py - TEMPORARY DEBUG VERSION
 from flask_marshmallow import Marshmallow
+from marshmallow import fields
 from utils.db import db
 
 ma = Marshmallow()
@@ -74,4 +75,74 @@ GuideSchema = schemas['GuideSchema']
 DestinationSchema = schemas['DestinationSchema']
 BookingSchema = schemas['BookingSchema']
 PaymentSchema = schemas['PaymentSchema']
-AdminSchema = schemas['AdminSchema']
\ No newline at end of file
+AdminSchema = schemas['AdminSchema']
+
+# Exact field classes whose serialization can be inlined; anything else
+# (subclasses, nested/related fields) goes through the field itself
+_PASSTHROUGH_TYPES = {fields.String: str, fields.Integer: int, fields.Float: float, fields.Boolean: bool}
+_RAW = object()
+
+def _inline_converter(field, attr_name):
+    """Inline equivalent of field._serialize: _RAW for the value as-is, None if it can't be inlined"""
+    field_type = type(field)
+    if field_type is fields.Raw:
+        return _RAW
+
+    if field_type in _PASSTHROUGH_TYPES and not getattr(field, 'as_string', False):
+        # Values already of the target type come back unchanged from marshmallow
+        target = _PASSTHROUGH_TYPES[field_type]
+        serialize = field._serialize
+        return lambda value: value if value is None or value.__class__ is target \
+            else serialize(value, attr_name, None)
+
+    if field_type in (fields.DateTime, fields.Date):
+        format_func = field.SERIALIZATION_FUNCS.get(field.format or field.DEFAULT_FORMAT)
+        if format_func is not None:
+            return lambda value: None if value is None else format_func(value)
+
+    return None
+
+class CompiledSchema:
+    """Drop-in for schema.dump() that compiles the schema's fields into one flat function.
+
+    Marshmallow dispatches through each field object for every row; for the
+    plain column fields of our auto schemas that is most of the cost of a
+    list page. The generated function reads each attribute once and applies
+    the same conversion inline, producing the same keys, order and values.
+    Fields that can't be inlined fall back to the field's own serialize.
+    """
+
+    def __init__(self, schema_class):
+        self.schema = schema_class()
+        self._dump_one = self._compile()
+
+    def _compile(self):
+        namespace = {}
+        entries = []
+        for index, (attr_name, field) in enumerate(self.schema.dump_fields.items()):
+            key = field.data_key if field.data_key is not None else attr_name
+            attribute = field.attribute or attr_name
+            converter = _inline_converter(field, attr_name)
+
+            if converter is None or not attribute.isidentifier() or field.dump_default is not fields.missing_:
+                # Fall back for the whole schema: a field may be missing and must then be left out
+                return self._dump_by_field()
+            if converter is _RAW:
+                entries.append(f'        {key!r}: obj.{attribute},\n')
+            else:
+                namespace[f'_convert{index}'] = converter
+                entries.append(f'        {key!r}: _convert{index}(obj.{attribute}),\n')
+
+        source = 'def dump(obj):\n    return {\n' + ''.join(entries) + '    }\n'
+        exec(compile(source, f'<compiled {type(self.schema).__name__}>', 'exec'), namespace)
+        return namespace['dump']
+
+    def _dump_by_field(self):
+        schema = self.schema
+        return lambda obj: schema.dump(obj)
+
+    def dump(self, obj, many=False):
+        if many:
+            dump_one = self._dump_one
+            return [dump_one(item) for item in obj]
+        return self._dump_one(obj)
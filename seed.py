@@ -1,12 +1,14 @@
 from app import create_app, db
 from models.destination import Destination
 from sqlalchemy import text
+from utils.dashboard_stats import record_destination_count_change
 
 app = create_app()
 
 with app.app_context():
     # Clear existing destinations from the plural table
-    db.session.execute(text('DELETE FROM destinations'))
+    deleted = db.session.execute(text('DELETE FROM destinations')).rowcount
+    record_destination_count_change(-deleted)
     db.session.commit()
 
     destinations = [
@@ -112,6 +114,7 @@ with app.app_context():
     ]
 
     db.session.add_all(destinations)
+    record_destination_count_change(len(destinations))
     db.session.commit()
 
     print("12 destinations seeded successfully!")
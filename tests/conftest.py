@@ -0,0 +1,28 @@
+import os
+
+# Must be set before config.py is imported by the app
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["SECRET_KEY"] = "test-secret-key-that-is-long-enough-for-hs256"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+import pytest
+from app import app as flask_app
+from utils.db import db
+from utils.auth_context import profile_cache
+
+
+@pytest.fixture
+def app():
+    """The application on a fresh in-memory SQLite database"""
+    flask_app.config.update(TESTING=True)
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+    profile_cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
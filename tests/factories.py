@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+from utils.db import db
+from utils.jwt_service import create_token
+from models.user import User
+from models.traveler import Traveler
+from models.guide import Guide
+from models.admin import Admin
+from models.destination import Destination
+from models.booking import Booking
+from models.payment import Payment
+
+def create_user(role, name):
+    user = User(full_name=name, email=f"{name.lower().replace(' ', '.')}@example.com", role=role)
+    user.set_password("password")
+    db.session.add(user)
+    db.session.flush()
+    return user
+
+def create_traveler(name="Traveler"):
+    traveler = Traveler(user=create_user("traveler", name), nationality="Kenyan")
+    db.session.add(traveler)
+    db.session.flush()
+    return traveler
+
+def create_guide(name="Guide"):
+    guide = Guide(user=create_user("guide", name), experience_years=5, languages="English, Swahili")
+    db.session.add(guide)
+    db.session.flush()
+    return guide
+
+def create_admin(name="Admin"):
+    admin = Admin(user=create_user("admin", name))
+    db.session.add(admin)
+    db.session.flush()
+    return admin
+
+def create_destination(name="Maasai Mara"):
+    destination = Destination(name=name, country="Kenya", price=250.0,
+                              image_url="https://example.com/image.jpg", category="popular")
+    db.session.add(destination)
+    db.session.flush()
+    return destination
+
+def create_booking(traveler, guide=None, destination=None, days_ahead=1, status="pending"):
+    booking = Booking(
+        traveler_id=traveler.id,
+        guide_id=guide.id if guide else None,
+        destination_id=destination.id if destination else None,
+        date=date.today() + timedelta(days=days_ahead),
+        status=status
+    )
+    db.session.add(booking)
+    db.session.flush()
+    return booking
+
+def create_payment(booking, amount=250.0, reference=None, status="pending"):
+    payment = Payment(booking_id=booking.id, amount=amount, status=status,
+                      transaction_id=reference or f"SH{booking.id:06d}")
+    db.session.add(payment)
+    db.session.flush()
+    return payment
+
+def auth_headers(profile):
+    """Bearer header for a traveler, guide or admin profile's user"""
+    user = profile.user
+    token = create_token(user.id, user.role, profile.id, user.token_version or 0)
+    return {"Authorization": f"Bearer {token}"}
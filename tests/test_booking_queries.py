@@ -0,0 +1,51 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from utils.db import db
+from factories import create_traveler, create_guide, create_admin, create_destination, create_booking, auth_headers
+
+PAGE_SIZES = (1, 3)
+
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+@pytest.fixture
+def bookings(app):
+    """Three bookings by one traveler, each with its own guide and destination, plus a second traveler's booking"""
+    traveler = create_traveler("Amina Wanjiru")
+    for i in range(3):
+        create_booking(traveler, create_guide(f"Guide {i}"), create_destination(f"Destination {i}"), days_ahead=i + 1)
+    create_booking(create_traveler("Other Traveler"), create_guide("Guide 3"), create_destination("Destination 3"))
+    admin = create_admin()
+    db.session.commit()
+    return {"traveler": auth_headers(traveler), "admin": auth_headers(admin)}
+
+def page_query_count(client, headers, size_param, size, cursor):
+    query_string = {size_param: size}
+    if cursor:
+        query_string["cursor"] = ""
+    with count_queries() as statements:
+        response = client.get("/api/bookings", headers=headers, query_string=query_string)
+    assert response.status_code == 200, response.get_json()
+    assert len(response.get_json()["bookings"]) == size
+    return len(statements)
+
+@pytest.mark.parametrize("scope", ["traveler", "admin"])
+@pytest.mark.parametrize("size_param, cursor", [("per_page", False), ("limit", True)], ids=["offset", "cursor"])
+def test_booking_list_query_count_does_not_grow_with_page_size(client, bookings, scope, size_param, cursor):
+    headers = bookings[scope]
+    # Warm the auth profile cache so both measured requests start from the same state
+    client.get("/api/bookings", headers=headers)
+
+    counts = [page_query_count(client, headers, size_param, size, cursor) for size in PAGE_SIZES]
+    assert counts[0] == counts[1], f"queries per page grew with page size: {dict(zip(PAGE_SIZES, counts))}"
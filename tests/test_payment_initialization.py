@@ -0,0 +1,83 @@
+import threading
+import time
+import pytest
+from utils.db import db
+from utils.paystack_service import paystack_service
+from utils.background import background_tasks
+from factories import create_traveler, create_guide, create_destination, create_booking, auth_headers
+
+GATEWAY_DELAY = 1.0
+
+class SlowGateway:
+    """Stands in for paystack_service.initialize_transaction, holding each call until released"""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.released = threading.Event()
+        self.calls = 0
+
+    def __call__(self, email, amount, reference=None, callback_url=None):
+        self.calls += 1
+        self.entered.set()
+        self.released.wait(GATEWAY_DELAY)
+        return {
+            'success': True,
+            'authorization_url': f'https://checkout.paystack.com/{reference}',
+            'access_code': 'access-code',
+            'reference': reference
+        }
+
+@pytest.fixture
+def gateway(monkeypatch):
+    gateway = SlowGateway()
+    monkeypatch.setattr(paystack_service, 'initialize_transaction', gateway)
+    return gateway
+
+@pytest.fixture
+def background_futures(monkeypatch):
+    """Futures of tasks submitted during the test, so they finish before the database is dropped"""
+    futures = []
+    submit = background_tasks.submit
+
+    def tracking_submit(fn, *args, **kwargs):
+        future = submit(fn, *args, **kwargs)
+        futures.append(future)
+        return future
+
+    monkeypatch.setattr(background_tasks, 'submit', tracking_submit)
+    yield futures
+    for future in futures:
+        future.result(timeout=GATEWAY_DELAY * 5)
+
+@pytest.fixture
+def booking(app):
+    traveler = create_traveler('Amina Wanjiru')
+    booking = create_booking(traveler, create_guide('Juma Otieno'), create_destination())
+    db.session.commit()
+    return {'id': booking.id, 'headers': auth_headers(traveler)}
+
+def create_payment_request(client, booking, headers=None):
+    return client.post('/api/payments', headers={**booking['headers'], **(headers or {})},
+                       json={'booking_id': booking['id'], 'amount': 250.0})
+
+def test_async_initialization_returns_while_the_gateway_is_slow(client, booking, gateway, background_futures):
+    started = time.perf_counter()
+    response = create_payment_request(client, booking, {'Prefer': 'respond-async'})
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 202, response.get_json()
+    assert elapsed < GATEWAY_DELAY / 2
+    # The gateway call is still in flight on the background thread
+    assert gateway.entered.wait(GATEWAY_DELAY)
+    assert len(background_futures) == 1 and not background_futures[0].done()
+
+    status_url = response.get_json()['status_url']
+    pending = client.get(status_url, headers=booking['headers']).get_json()
+    assert pending['ready'] is False and pending['status'] == 'pending'
+
+    gateway.released.set()
+    background_futures[0].result(timeout=GATEWAY_DELAY * 5)
+
+    ready = client.get(status_url, headers=booking['headers']).get_json()
+    assert ready['ready'] is True
+    assert ready['authorization_url'] == f"https://checkout.paystack.com/{ready['reference']}"
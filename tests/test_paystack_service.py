@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.paystack_service import PayStackService
+
+class StubPayStack(ThreadingHTTPServer):
+    """Local PayStack stand-in that replays scripted (status, body, delay) responses per path"""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.responses = {}
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def script(self, path, *responses):
+        self.responses[path] = list(responses)
+
+    def next_response(self, method, path):
+        with self.lock:
+            self.hits[(method, path)] = self.hits.get((method, path), 0) + 1
+            scripted = self.responses.get(path) or [(404, {"status": False, "message": "Not scripted"}, 0)]
+            # The last scripted response repeats for any further calls
+            return scripted.pop(0) if len(scripted) > 1 else scripted[0]
+
+class StubHandler(BaseHTTPRequestHandler):
+    def _respond(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status, body, delay = self.server.next_response(self.command, self.path)
+        time.sleep(delay)
+        payload = json.dumps(body).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on a delayed response
+            pass
+
+    do_GET = do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+@pytest.fixture
+def stub():
+    server = StubPayStack()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def paystack(app, stub):
+    """A PayStackService configured against the stub; the shared singleton is left untouched"""
+    overrides = {
+        "PAYSTACK_SECRET_KEY": "sk_test_stub",
+        "PAYSTACK_BASE_URL": f"http://127.0.0.1:{stub.server_port}",
+        "PAYSTACK_CONNECT_TIMEOUT": 1,
+        "PAYSTACK_READ_TIMEOUT": 0.3
+    }
+    saved = {key: app.config.get(key) for key in overrides}
+    extension = app.extensions.get("paystack")
+    app.config.update(overrides)
+    service = PayStackService(app)
+    yield service
+    service.session.close()
+    app.config.update(saved)
+    if extension is not None:
+        app.extensions["paystack"] = extension
+
+SERVER_ERROR = (500, {"status": False, "message": "Internal error"}, 0)
+VERIFIED = (200, {"status": True, "data": {"status": "success", "reference": "SH000001"}}, 0)
+INITIALIZED = (200, {"status": True, "data": {
+    "authorization_url": "https://checkout.paystack.com/abc", "access_code": "abc", "reference": "SH000001"
+}}, 0)
+
+def test_read_timeout_bounds_a_slow_initialize(paystack, stub):
+    stub.script("/transaction/initialize", (INITIALIZED[0], INITIALIZED[1], 2))
+
+    started = time.perf_counter()
+    result = paystack.initialize_transaction("amina@example.com", 250.0, reference="SH000001")
+    elapsed = time.perf_counter() - started
+
+    assert result["success"] is False
+    assert "timed out" in result["message"].lower()
+    assert elapsed < 1.5
+    assert stub.hits[("POST", "/transaction/initialize")] == 1
+    assert paystack.metrics.snapshot()["transaction.initialize"]["errors"] == 1
+
+def test_verify_is_retried_on_server_errors(paystack, stub):
+    stub.script("/transaction/verify/SH000001", SERVER_ERROR, SERVER_ERROR, VERIFIED)
+
+    result = paystack.verify_transaction("SH000001")
+
+    assert result["success"] is True
+    assert stub.hits[("GET", "/transaction/verify/SH000001")] == 3
+
+def test_verify_gives_up_after_the_status_retry_budget(paystack, stub):
+    stub.script("/transaction/verify/SH000001", SERVER_ERROR)
+
+    result = paystack.verify_transaction("SH000001")
+
+    assert result["success"] is False
+    # One attempt plus Retry(status=2)
+    assert stub.hits[("GET", "/transaction/verify/SH000001")] == 3
+    assert paystack.metrics.snapshot()["transaction.verify"]["errors"] == 1
+
+def test_initialize_is_not_retried_on_server_errors(paystack, stub):
+    stub.script("/transaction/initialize", SERVER_ERROR, INITIALIZED)
+
+    result = paystack.initialize_transaction("amina@example.com", 250.0, reference="SH000001")
+
+    assert result == {"success": False, "message": "Internal error"}
+    assert stub.hits[("POST", "/transaction/initialize")] == 1
@@ -0,0 +1,98 @@
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import event
+from utils.db import db
+from utils.auth_context import profile_cache
+from utils.guide_availability import get_guide_availability, available_guides_query
+from models.payment import Payment
+from factories import (create_traveler, create_guide, create_admin, create_destination, create_booking,
+                       create_payment, auth_headers)
+
+@contextmanager
+def captured_selects():
+    """(statement, parameters) of every SELECT run on the engine while the block executes"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+def full_scans(statements, tables):
+    """EXPLAIN QUERY PLAN lines that read one of `tables` row by row without an index"""
+    scan = re.compile(r"^SCAN (TABLE )?(%s)$" % "|".join(tables))
+    connection = db.session.connection()
+    problems = []
+    for statement, parameters in statements:
+        for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters):
+            detail = row[-1]
+            if scan.match(detail):
+                problems.append(f"{detail}\n    in: {' '.join(statement.split())}")
+    return problems
+
+@pytest.fixture
+def data(app):
+    travelers = [create_traveler(f"Traveler {i}") for i in range(3)]
+    guides = [create_guide(f"Guide {i}") for i in range(3)]
+    destinations = [create_destination(f"Destination {i}") for i in range(3)]
+    bookings = []
+    for i in range(12):
+        booking = create_booking(travelers[i % 3], guides[i % 3], destinations[i % 3], days_ahead=i + 1,
+                                 status=("pending", "confirmed", "completed")[i % 3])
+        create_payment(booking, status="completed" if booking.status == "completed" else "pending")
+        bookings.append(booking)
+    admin = create_admin()
+    db.session.commit()
+    profile_cache.clear()
+    return {
+        "traveler": travelers[0], "guide": guides[0], "admin": admin,
+        "destination": destinations[0], "booking": bookings[0]
+    }
+
+@pytest.mark.parametrize("scope", ["traveler", "guide", "admin"])
+@pytest.mark.parametrize("query_string", [{}, {"status": "pending"}, {"cursor": ""}], ids=["offset", "status", "cursor"])
+def test_booking_list_and_detail_are_index_backed(client, data, scope, query_string):
+    headers = auth_headers(data[scope])
+    with captured_selects() as statements:
+        assert client.get("/api/bookings", headers=headers, query_string=query_string).status_code == 200
+        if scope != "guide" or data["booking"].guide_id == data["guide"].id:
+            assert client.get(f"/api/bookings/{data['booking'].id}", headers=headers).status_code == 200
+
+    problems = full_scans(statements, ["bookings", "payments"])
+    assert not problems, "\n".join(problems)
+
+def test_availability_probe_is_index_backed(data):
+    guide, destination = data["guide"], data["destination"]
+    start = date.today()
+    with captured_selects() as statements:
+        get_guide_availability(guide.id, start, start + timedelta(days=30))
+        available_guides_query(start, start + timedelta(days=3), destination_id=destination.id).all()
+
+    problems = full_scans(statements, ["bookings", "payments", "guide_day_slots"])
+    assert not problems, "\n".join(problems)
+
+def test_payment_by_booking_lookup_is_index_backed(data):
+    booking = data["booking"]
+    with captured_selects() as statements:
+        # The duplicate-payment check in PaymentList.post
+        Payment.query.filter(Payment.booking_id == booking.id, Payment.status == "completed").first()
+        Payment.query.filter_by(booking_id=booking.id).first()
+
+    problems = full_scans(statements, ["bookings", "payments"])
+    assert not problems, "\n".join(problems)
+
+@pytest.mark.parametrize("scope", ["traveler", "guide"])
+def test_profile_by_user_lookup_is_index_backed(client, data, scope):
+    with captured_selects() as statements:
+        # A cold auth cache resolves the profile id from the user id, and /profile loads the profile row
+        assert client.get("/api/auth/profile", headers=auth_headers(data[scope])).status_code == 200
+
+    problems = full_scans(statements, ["travelers", "guides"])
+    assert not problems, "\n".join(problems)
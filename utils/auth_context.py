@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, g
+from utils.db import db
+
+class ProfileCache:
+    """Thread-safe in-process LRU with a per-entry TTL, keyed by user id.
+
+    Each gunicorn worker keeps its own copy, so invalidation is local and the
+    TTL bounds how long another worker can serve a stale entry.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+profile_cache = ProfileCache()
+
+# Bump when the set of claims written by create_token changes
+TOKEN_CLAIMS_VERSION = 2
+
+def _load_profile_ids(user):
+    """Look up the id of the role profile for this user (one query at most)"""
+    from models.traveler import Traveler
+    from models.guide import Guide
+    from models.admin import Admin
+
+    profile_ids = {
+        'role': user.role,
+        'token_version': user.token_version,
+        'traveler_id': None,
+        'guide_id': None,
+        'admin_id': None
+    }
+    profile_model = {'traveler': Traveler, 'guide': Guide, 'admin': Admin}.get(user.role)
+    if profile_model is not None:
+        profile_ids[f'{user.role}_id'] = db.session.query(profile_model.id) \
+            .filter(profile_model.user_id == user.id).limit(1).scalar()
+    return profile_ids
+
+class AuthContext:
+    """The authenticated user's id, role and role profile ids, resolved once per request.
+
+    The User row itself is only loaded if something reads `user`.
+    """
+
+    def __init__(self, user_id, role, traveler_id=None, guide_id=None, admin_id=None, user=None):
+        self.user_id = user_id
+        self.role = role
+        self.traveler_id = traveler_id
+        self.guide_id = guide_id
+        self.admin_id = admin_id
+        self._user = user
+
+    @property
+    def user(self):
+        if self._user is None:
+            from models.user import User
+            self._user = User.query.get(self.user_id)
+        return self._user
+
+    @classmethod
+    def from_user(cls, user):
+        profile_ids = profile_cache.get(user.id)
+        if profile_ids is None or profile_ids['role'] != user.role \
+                or profile_ids['token_version'] != user.token_version:
+            profile_ids = _load_profile_ids(user)
+            profile_cache.set(user.id, profile_ids, ttl=current_app.config.get('AUTH_CACHE_TTL'))
+
+        return cls(user.id, user.role, profile_ids['traveler_id'], profile_ids['guide_id'],
+                   profile_ids['admin_id'], user=user)
+
+def resolve_auth_context(claims):
+    """Build the AuthContext for verified token claims.
+
+    Tokens carrying the current claim set are authorized from the claims alone
+    when the cached token version for the user still matches (no queries).
+    Otherwise the user is loaded to check the version and refresh the cache.
+    Returns None if the user no longer exists or the token has been revoked.
+    """
+    from models.user import User
+
+    user_id = claims.get('user_id')
+    current_claims = claims.get('cv') == TOKEN_CLAIMS_VERSION
+
+    if current_claims:
+        cached = profile_cache.get(user_id)
+        if cached is not None and cached['token_version'] == claims.get('tv') \
+                and cached['role'] == claims.get('role'):
+            role = claims['role']
+            profile_ids = {key: cached[key] for key in ('traveler_id', 'guide_id', 'admin_id')}
+            if claims.get('pid') is not None and role in ('traveler', 'guide', 'admin'):
+                profile_ids[f'{role}_id'] = claims['pid']
+            return AuthContext(user_id, role, **profile_ids)
+
+    user = User.query.get(user_id)
+    if not user:
+        return None
+    if current_claims and (user.token_version != claims.get('tv') or user.role != claims.get('role')):
+        return None
+    return AuthContext.from_user(user)
+
+def get_auth_context():
+    """Return the AuthContext set up by token_required / role_required"""
+    return g.get('auth')
+
+def invalidate_auth_cache(user_id):
+    """Drop cached profile ids and token version after a user's role, profiles or tokens change"""
+    profile_cache.invalidate(user_id)
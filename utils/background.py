@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+class BackgroundTasks:
+    """Small thread pool for work that should not hold a request worker.
+
+    Each task runs inside its own application context, so it gets a fresh
+    database session that is removed when the task finishes. Tasks must only
+    receive plain values (ids, strings) rather than ORM objects bound to the
+    request's session.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('BACKGROUND_WORKERS', 4),
+            thread_name_prefix='background'
+        )
+        app.extensions['background_tasks'] = self
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return its Future"""
+        app = self.app
+
+        def run():
+            with app.app_context():
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    app.logger.exception('Background task %s failed', fn.__name__)
+                    raise
+
+        return self._executor.submit(run)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+background_tasks = BackgroundTasks()
+
+class CoalescedTask:
+    """Runs `fn` on background_tasks, at most once at a time per process.
+
+    Requests that arrive while a run is in progress are folded into one more
+    run afterwards, so a burst of N requests costs at most two runs.
+    """
+
+    def __init__(self, fn):
+        self.fn = fn
+        self._lock = threading.Lock()
+        self._requested = threading.Event()
+
+    def schedule(self):
+        self._requested.set()
+        background_tasks.submit(self.run)
+
+    def run(self, *args, **kwargs):
+        """Run now in the calling thread; returns the summed results of fn, or 0 if another run is active"""
+        self._requested.set()
+        total = 0
+        while True:
+            if not self._lock.acquire(blocking=False):
+                # The run in progress will see the request flag
+                return total
+            try:
+                while self._requested.is_set():
+                    self._requested.clear()
+                    total += self.fn(*args, **kwargs) or 0
+            finally:
+                self._lock.release()
+
+            # A request may have arrived between the last check and releasing the lock
+            if not self._requested.is_set():
+                return total
@@ -1,8 +1,14 @@
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.utils
 from flask import current_app
 import os
+import secrets
+import time
+
+# Cloudinary requires every chunk but the last to be at least 5MB
+STREAM_CHUNK_SIZE = 6 * 1024 * 1024
 
 def configure_cloudinary(app):
     """Configure Cloudinary with the app context"""
@@ -32,4 +38,80 @@ def upload_to_cloudinary(file, folder="safarihub"):
         return {
             "success": False,
             "error": str(e)
-        }
\ No newline at end of file
+        }
+
+def signed_upload_params(folder, public_id_prefix):
+    """Signed parameters for a browser to upload straight to Cloudinary.
+
+    The public id is fixed by the server so the completion callback can check
+    the upload belongs to the caller. Cloudinary rejects the signature once the
+    timestamp is an hour old.
+    """
+    config = cloudinary.config()
+    params = {
+        "timestamp": int(time.time()),
+        "folder": folder,
+        "public_id": f"{public_id_prefix}_{secrets.token_hex(8)}"
+    }
+    params["signature"] = cloudinary.utils.api_sign_request(params, config.api_secret)
+    params["api_key"] = config.api_key
+    params["upload_url"] = f"https://api.cloudinary.com/v1_1/{config.cloud_name}/image/upload"
+    return params
+
+def verify_direct_upload(public_id, version, signature):
+    """Check a client-reported upload result against Cloudinary's response signature.
+
+    Returns the delivery URL, or None if the signature does not match.
+    """
+    if not cloudinary.utils.verify_api_response_signature(public_id, version, signature):
+        return None
+    url, _ = cloudinary.utils.cloudinary_url(public_id, version=version, secure=True, resource_type="image")
+    return url
+
+def _read_chunk(stream, size):
+    """Read up to `size` bytes, looping over short reads from the WSGI input"""
+    parts = []
+    remaining = size
+    while remaining:
+        data = stream.read(remaining)
+        if not data:
+            break
+        parts.append(data)
+        remaining -= len(data)
+    return b"".join(parts)
+
+def stream_to_cloudinary(stream, total_size, folder="safarihub", filename="upload", chunk_size=STREAM_CHUNK_SIZE):
+    """Pipe a request body to Cloudinary's chunked upload API, holding one chunk in memory at a time"""
+    try:
+        upload_id = cloudinary.utils.random_public_id()
+        offset = 0
+        upload_result = None
+        while offset < total_size:
+            chunk = _read_chunk(stream, min(chunk_size, total_size - offset))
+            if not chunk:
+                raise ValueError("Request body ended before Content-Length bytes were read")
+            headers = {
+                "Content-Range": f"bytes {offset}-{offset + len(chunk) - 1}/{total_size}",
+                "X-Unique-Upload-Id": upload_id
+            }
+            upload_result = cloudinary.uploader.upload_large_part(
+                (filename, chunk),
+                http_headers=headers,
+                resource_type="image",
+                folder=folder,
+                use_filename=True,
+                unique_filename=True,
+                overwrite=False
+            )
+            offset += len(chunk)
+
+        return {
+            "success": True,
+            "url": upload_result.get("secure_url"),
+            "public_id": upload_result.get("public_id")
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e)
+        }
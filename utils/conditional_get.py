@@ -0,0 +1,120 @@
+import hashlib
+import json
+import threading
+from functools import wraps
+from flask import current_app, g, request, Response
+from sqlalchemy import func
+from utils.db import db
+from utils.auth_context import get_auth_context
+
+class ConditionalGetMetrics:
+    """Per-endpoint GET counts, 304s, and 304s answered before the handler ran"""
+
+    def __init__(self):
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, not_modified, short_circuit):
+        with self._lock:
+            stats = self._endpoints.setdefault(endpoint, {'requests': 0, 'not_modified': 0, 'short_circuit': 0})
+            stats['requests'] += 1
+            stats['not_modified'] += int(not_modified)
+            stats['short_circuit'] += int(short_circuit)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(stats, hit_rate=round(stats['not_modified'] / stats['requests'], 4))
+                for endpoint, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+conditional_get_metrics = ConditionalGetMetrics()
+
+def collection_version(query, model):
+    """(row count, newest updated_at) of a filtered query; changes on insert, update and delete"""
+    count, last_updated = query.with_entities(func.count(model.id), func.max(model.updated_at)).one()
+    return count, last_updated
+
+def table_version(model):
+    return collection_version(db.session.query(model), model)
+
+def row_version(model, row_id):
+    return db.session.query(model.updated_at).filter(model.id == row_id).scalar()
+
+def latest_updates(*models):
+    """max(updated_at) of each model's table in one round trip; for related rows embedded in a response"""
+    return list(db.session.query(*[
+        db.session.query(func.max(model.updated_at)).scalar_subquery() for model in models
+    ]).one())
+
+def mark_not_modified_early():
+    """Record that a 304 was produced without running the handler (see after_request)"""
+    g.conditional_get_short_circuit = True
+
+def conditional_get(fingerprint):
+    """Answer If-None-Match with a 304 before the handler runs, using a cheap version query.
+
+    `fingerprint(**view_args)` returns any JSON-serializable value that changes
+    whenever the response would (typically updated_at/count aggregates), or None
+    to skip. The ETag also covers the endpoint, query args and the caller's
+    identity, so it is never shared between users. Place below token_required /
+    role_required so the auth context is available.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                version = fingerprint(**kwargs)
+            except Exception:
+                current_app.logger.exception('Conditional GET fingerprint failed for %s', request.endpoint)
+                version = None
+            if version is None:
+                return f(*args, **kwargs)
+
+            auth = get_auth_context()
+            raw = json.dumps([
+                request.endpoint,
+                sorted(kwargs.items()),
+                sorted(request.args.items(multi=True)),
+                [auth.user_id, auth.role] if auth else None,
+                version
+            ], default=str)
+            etag = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                mark_not_modified_early()
+                return Response(status=304, headers={'ETag': f'W/"{etag}"'})
+
+            result = f(*args, **kwargs)
+            if isinstance(result, tuple) and len(result) >= 2 and result[1] == 200:
+                headers = dict(result[2]) if len(result) > 2 else {}
+                headers['ETag'] = f'W/"{etag}"'
+                return result[0], 200, headers
+            return result
+        return decorated
+    return decorator
+
+def register_conditional_get(app):
+    """Fallback validators for GET responses without their own ETag, plus hit-rate metrics"""
+
+    @app.after_request
+    def add_etag(response):
+        if request.method != 'GET':
+            return response
+
+        if response.status_code == 200 and 'ETag' not in response.headers \
+                and not response.is_streamed and response.mimetype == 'application/json':
+            # Saves the transfer, not the work: the body was already built
+            response.add_etag()
+            response.make_conditional(request)
+
+        conditional_get_metrics.record(
+            request.endpoint or 'unknown',
+            not_modified=response.status_code == 304,
+            short_circuit=g.get('conditional_get_short_circuit', False)
+        )
+        return response
@@ -0,0 +1,154 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased
+from utils.db import db
+from models.user import User
+from models.traveler import Traveler
+from models.guide import Guide
+from models.booking import Booking
+from models.destination import Destination
+from models.payment import Payment
+from models.dashboard_counter import DashboardCounter
+
+stats_cli = AppGroup("stats", help="Maintain materialized dashboard counters.")
+
+def _bump_counter(name, delta):
+    """Adjust a running counter inside the caller's transaction.
+
+    One upsert, so two transactions creating the same counter cannot race into
+    a duplicate key.
+    """
+    if not delta:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(DashboardCounter).values(name=name, value=delta)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[DashboardCounter.name],
+            set_={'value': DashboardCounter.value + stmt.excluded.value}
+        ))
+        return
+
+    result = db.session.execute(
+        update(DashboardCounter)
+        .where(DashboardCounter.name == name)
+        .values(value=DashboardCounter.value + delta)
+    )
+    if result.rowcount == 0:
+        db.session.add(DashboardCounter(name=name, value=delta))
+
+def record_user_role_change(old_role, new_role):
+    """Call before committing a user insert (old_role=None) or role change"""
+    if old_role == new_role:
+        return
+    if old_role:
+        _bump_counter(f'users:role:{old_role}', -1)
+    if new_role:
+        _bump_counter(f'users:role:{new_role}', 1)
+
+def record_booking_status_change(old_status, new_status):
+    """Call before committing a booking insert (old_status=None), status change or delete (new_status=None)"""
+    if old_status == new_status:
+        return
+    if old_status:
+        _bump_counter(f'bookings:status:{old_status}', -1)
+    if new_status:
+        _bump_counter(f'bookings:status:{new_status}', 1)
+
+def record_payment_status_change(payment, old_status, new_status):
+    """Call before committing a payment status change; only completed payments count as revenue"""
+    if (old_status == 'completed') == (new_status == 'completed'):
+        return
+    delta = payment.amount if new_status == 'completed' else -payment.amount
+    _bump_counter(f'revenue:currency:{payment.currency or "KES"}', delta)
+
+def record_destination_count_change(delta):
+    _bump_counter('destinations:total', delta)
+
+def compute_dashboard_counters():
+    """Recompute every counter from the source tables with grouped aggregates"""
+    counters = {}
+
+    for role, count in db.session.query(User.role, func.count(User.id)).group_by(User.role):
+        counters[f'users:role:{role}'] = count
+
+    booking_status = func.coalesce(Booking.status, 'pending')
+    for status, count in db.session.query(booking_status, func.count(Booking.id)).group_by(booking_status):
+        counters[f'bookings:status:{status}'] = count
+
+    currency = func.coalesce(Payment.currency, 'KES')
+    for code, total in db.session.query(currency, func.sum(Payment.amount)) \
+            .filter(Payment.status == 'completed').group_by(currency):
+        counters[f'revenue:currency:{code}'] = float(total or 0)
+
+    counters['destinations:total'] = db.session.query(func.count(Destination.id)).scalar()
+    return counters
+
+def rebuild_dashboard_counters():
+    """Replace the materialized counters with freshly computed values in one transaction"""
+    counters = compute_dashboard_counters()
+    DashboardCounter.query.delete()
+    db.session.add_all([DashboardCounter(name=name, value=value) for name, value in counters.items()])
+    db.session.commit()
+    return counters
+
+def get_dashboard_statistics():
+    """Read the admin dashboard counters from the materialized counters table"""
+    counters = {c.name: c.value for c in DashboardCounter.query.all()}
+
+    def total(prefix):
+        return sum(value for name, value in counters.items() if name.startswith(prefix))
+
+    return {
+        'total_users': int(total('users:role:')),
+        'total_travelers': int(counters.get('users:role:traveler', 0)),
+        'total_guides': int(counters.get('users:role:guide', 0)),
+        'total_destinations': int(counters.get('destinations:total', 0)),
+        'total_bookings': int(total('bookings:status:')),
+        'active_bookings': int(counters.get('bookings:status:confirmed', 0)),
+        'total_revenue': float(total('revenue:currency:')),
+        'revenue_by_currency': {
+            name.split(':', 2)[2]: value for name, value in counters.items()
+            if name.startswith('revenue:currency:')
+        }
+    }
+
+def get_recent_bookings(limit=10):
+    """Most recent bookings with traveler, destination and guide names joined in"""
+    traveler_user = aliased(User)
+    guide_user = aliased(User)
+
+    rows = db.session.query(
+        Booking.id,
+        Booking.status,
+        Booking.created_at,
+        traveler_user.full_name.label('traveler_name'),
+        Destination.name.label('destination_name'),
+        guide_user.full_name.label('guide_name')
+    ).outerjoin(Traveler, Booking.traveler_id == Traveler.id) \
+        .outerjoin(traveler_user, Traveler.user_id == traveler_user.id) \
+        .outerjoin(Destination, Booking.destination_id == Destination.id) \
+        .outerjoin(Guide, Booking.guide_id == Guide.id) \
+        .outerjoin(guide_user, Guide.user_id == guide_user.id) \
+        .order_by(Booking.created_at.desc()) \
+        .limit(limit) \
+        .all()
+
+    return [{
+        'id': row.id,
+        'traveler_name': row.traveler_name or 'Unknown',
+        'destination_name': row.destination_name or 'Unknown',
+        'guide_name': row.guide_name or 'Not assigned',
+        'status': row.status,
+        'created_at': row.created_at.isoformat() if row.created_at else None
+    } for row in rows]
+
+@stats_cli.command("rebuild")
+def rebuild_command():
+    """Recompute dashboard counters from the source tables."""
+    counters = rebuild_dashboard_counters()
+    for name in sorted(counters):
+        click.echo(f"{name}: {counters[name]}")
@@ -0,0 +1,85 @@
+import re
+from sqlalchemy import text, func, or_, table, column, literal_column, literal, select, type_coerce, inspect
+from sqlalchemy.dialects.postgresql import JSONB
+from utils.db import db
+from models.destination import Destination
+
+# Full-text index objects are created by migration 9b0c2e5d7f41 (add_destination_search_index):
+#   SQLite   - destinations_fts, an FTS5 table over name/description/country kept in sync by triggers
+#   Postgres - destinations.search_vector, a generated tsvector column with a GIN index
+destinations_fts = table('destinations_fts', column('rowid'))
+search_vector = literal_column('destinations.search_vector')
+
+MAX_SEARCH_TERMS = 8
+
+# Per-database answer to "does the full-text index exist", looked up once per process
+_fulltext_available = {}
+
+def _search_terms(search):
+    return re.findall(r'\w+', search.lower(), re.UNICODE)[:MAX_SEARCH_TERMS]
+
+def _has_fulltext_index(bind):
+    """False for databases built with db.create_all() rather than migrations, which lack these objects"""
+    key = bind.url
+    if key not in _fulltext_available:
+        inspector = inspect(bind)
+        if bind.dialect.name == 'sqlite':
+            _fulltext_available[key] = inspector.has_table('destinations_fts')
+        else:
+            columns = inspector.get_columns('destinations')
+            _fulltext_available[key] = any(col['name'] == 'search_vector' for col in columns)
+    return _fulltext_available[key]
+
+def _substring_search(query, terms):
+    for term in terms:
+        query = query.filter(
+            or_(
+                Destination.name.ilike(f'%{term}%'),
+                Destination.description.ilike(f'%{term}%'),
+                Destination.country.ilike(f'%{term}%')
+            )
+        )
+    return query.order_by(Destination.name)
+
+def search_destinations(query, search):
+    """Filter a Destination query to full-text matches for `search`, best matches first.
+
+    Every term must match, and the last characters of each term are treated as a
+    prefix ("mara" matches "Maasai Mara", "nair" matches "Nairobi"). Ties are
+    ordered by name.
+    """
+    terms = _search_terms(search)
+    if not terms:
+        return query.order_by(Destination.name)
+
+    bind = db.session.get_bind()
+    dialect = bind.dialect.name
+
+    if dialect not in ('sqlite', 'postgresql') or not _has_fulltext_index(bind):
+        # No index to use; fall back to substring matching
+        return _substring_search(query, terms)
+
+    if dialect == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        # bm25 weights follow the column order: name, description, country
+        return query.join(destinations_fts, destinations_fts.c.rowid == Destination.id) \
+            .filter(text('destinations_fts MATCH :fts_match').bindparams(fts_match=match)) \
+            .order_by(text('bm25(destinations_fts, 10.0, 1.0, 5.0)'), Destination.name)
+
+    tsquery = func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms))
+    return query.filter(search_vector.op('@@')(tsquery)) \
+        .order_by(func.ts_rank(search_vector, tsquery).desc(), Destination.name)
+
+def filter_by_amenities(query, amenities):
+    """Keep destinations whose included_amenities contain every name in `amenities`"""
+    dialect = db.session.get_bind().dialect.name
+    for amenity in amenities:
+        if dialect == 'postgresql':
+            # jsonb @> served by the GIN index ix_destinations_included_amenities
+            query = query.filter(type_coerce(Destination.included_amenities, JSONB).contains([amenity]))
+        else:
+            amenity_values = func.json_each(Destination.included_amenities).table_valued('value')
+            query = query.filter(
+                select(literal(1)).select_from(amenity_values).where(amenity_values.c.value == amenity).exists()
+            )
+    return query
@@ -1,14 +1,141 @@
+import random
+from datetime import datetime, timedelta
+from itertools import groupby
+import click
 import requests
+from requests.adapters import HTTPAdapter
 from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event
+from utils.db import db
+from utils.background import CoalescedTask
+from models.email_outbox import OutboxEmail
 
-def send_email(to, subject, message):
+email_cli = AppGroup("email", help="Outbound email queue.")
+
+SENDGRID_URL = "https://api.sendgrid.com/v3/mail/send"
+FROM_EMAIL = "noreply@safarihub.com"
+
+BATCH_SIZE = 500
+MAX_PERSONALIZATIONS = 1000  # SendGrid limit per mail/send call
+MAX_ATTEMPTS = 8
+TIMEOUT = (3.05, 15)
+
+# Keep-alive connection to SendGrid shared by every delivery run
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
+def send_email(to, subject, message, commit=True):
+    """Queue an email for delivery; the caller only pays for the INSERT.
+
+    Pass commit=False to enqueue inside the caller's transaction so the email
+    is only sent if that transaction commits.
+    """
+    db.session.add(OutboxEmail(to_email=to, subject=subject, body=message))
+    if commit:
+        db.session.commit()
+        outbox_worker.schedule()
+    else:
+        # Picked up by _schedule_committed_outbox once the caller commits
+        db.session.info['outbox_pending'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def _schedule_committed_outbox(session):
+    if session.info.pop('outbox_pending', False):
+        outbox_worker.schedule()
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def _discard_rolled_back_outbox(session, previous_transaction):
+    # A savepoint rollback leaves the outer transaction's emails queued
+    if previous_transaction.parent is None:
+        session.info.pop('outbox_pending', None)
+
+def _retry_delay(attempts):
+    """Exponential backoff from 30s, capped at an hour, with jitter"""
+    delay = min(30 * 2 ** (attempts - 1), 3600)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def _post_to_sendgrid(subject, body, recipients):
+    """Send one message to many recipients, one personalization each so they stay hidden from each other"""
     api_key = current_app.config.get("SENDGRID_API_KEY")
-    url = "https://api.sendgrid.com/v3/mail/send"
     payload = {
-        "personalizations": [{"to": [{"email": to}]}],
-        "from": {"email": "noreply@safarihub.com"},
+        "personalizations": [{"to": [{"email": to}]} for to in recipients],
+        "from": {"email": FROM_EMAIL},
         "subject": subject,
-        "content": [{"type": "text/plain", "value": message}]
+        "content": [{"type": "text/plain", "value": body}]
     }
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    requests.post(url, json=payload, headers=headers)
+    return _session.post(SENDGRID_URL, json=payload, headers=headers, timeout=TIMEOUT)
+
+def _mark_failed(emails, error, permanent, now):
+    for email in emails:
+        email.attempts += 1
+        email.last_error = error
+        if permanent or email.attempts >= MAX_ATTEMPTS:
+            email.status = 'dead'
+        else:
+            email.next_attempt_at = now + _retry_delay(email.attempts)
+
+def deliver_outbox_batch(batch_size=BATCH_SIZE):
+    """Send due emails, grouping identical messages into one SendGrid call. Returns how many were claimed."""
+    now = datetime.utcnow()
+    emails = OutboxEmail.query.filter(
+        OutboxEmail.status == 'pending',
+        OutboxEmail.next_attempt_at <= now
+    ).order_by(OutboxEmail.next_attempt_at, OutboxEmail.id).limit(batch_size) \
+        .with_for_update(skip_locked=True).all()
+    if not emails:
+        return 0
+
+    message_key = lambda email: (email.subject, email.body)
+    for _, group in groupby(sorted(emails, key=message_key), key=message_key):
+        group = list(group)
+        for start in range(0, len(group), MAX_PERSONALIZATIONS):
+            chunk = group[start:start + MAX_PERSONALIZATIONS]
+            try:
+                response = _post_to_sendgrid(chunk[0].subject, chunk[0].body, [email.to_email for email in chunk])
+            except requests.RequestException as e:
+                _mark_failed(chunk, str(e), permanent=False, now=now)
+                continue
+
+            if response.status_code < 300:
+                for email in chunk:
+                    email.status = 'sent'
+                    email.attempts += 1
+                    email.sent_at = now
+            else:
+                # Rate limiting and server errors are retried; other 4xx will fail the same way again
+                retryable = response.status_code == 429 or response.status_code >= 500
+                _mark_failed(chunk, f"SendGrid {response.status_code}: {response.text[:500]}",
+                             permanent=not retryable, now=now)
+
+    db.session.commit()
+    return len(emails)
+
+def deliver_outbox(batch_size=BATCH_SIZE):
+    """Deliver due emails until none are left. Returns how many were claimed."""
+    delivered = 0
+    while True:
+        claimed = deliver_outbox_batch(batch_size)
+        delivered += claimed
+        if claimed < batch_size:
+            return delivered
+
+outbox_worker = CoalescedTask(deliver_outbox)
+
+@email_cli.command("drain")
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True)
+def drain_command(batch_size):
+    """Deliver every email that is due now (run periodically to pick up retries)."""
+    processed = outbox_worker.run(batch_size)
+    click.echo(f"Processed {processed} email(s)")
+
+@email_cli.command("retry-dead")
+def retry_dead_command():
+    """Move dead-lettered emails back to the queue."""
+    revived = OutboxEmail.query.filter(OutboxEmail.status == 'dead').update(
+        {'status': 'pending', 'attempts': 0, 'next_attempt_at': datetime.utcnow()},
+        synchronize_session=False
+    )
+    db.session.commit()
+    click.echo(f"Requeued {revived} email(s)")
@@ -9,6 +9,9 @@ class NotFoundError(Exception):
 class UnauthorizedError(Exception):
     pass
 
+class ConflictError(Exception):
+    pass
+
 def register_error_handlers(app):
     @app.errorhandler(ValidationError)
     def handle_validation_error(e):
@@ -22,6 +25,10 @@ def register_error_handlers(app):
     def handle_unauthorized_error(e):
         return jsonify({"error": str(e)}), 403
 
+    @app.errorhandler(ConflictError)
+    def handle_conflict_error(e):
+        return jsonify({"error": str(e)}), 409
+
     @app.errorhandler(404)
     def not_found(e):
         return jsonify({"error": "Resource not found"}), 404
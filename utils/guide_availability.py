@@ -0,0 +1,110 @@
+from datetime import date, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from utils.db import db
+from utils.error_handlers import ConflictError, ValidationError
+from models.guide_day_slot import GuideDaySlot
+from utils.helpers import ids_having_all
+from models.guide import Guide, GuideLanguage, GuideSpecialty
+from models.user import User
+from models.booking import Booking
+from models.destination import Destination
+
+# Booking statuses that hold the guide's day
+ACTIVE_BOOKING_STATUSES = ('pending', 'confirmed')
+
+MAX_AVAILABILITY_DAYS = 366
+
+def claim_guide_day(booking):
+    """Reserve the booking's guide and date; raises ConflictError if the day is taken.
+
+    Runs in a savepoint so a lost race only undoes the slot, not the caller's
+    transaction. The booking must have been flushed so it has an id.
+    """
+    if not booking.guide_id or not booking.date:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(GuideDaySlot(guide_id=booking.guide_id, date=booking.date, booking_id=booking.id))
+    except IntegrityError:
+        raise ConflictError('Guide is not available on this date')
+
+def release_guide_day(booking):
+    """Free the day held by this booking, if any"""
+    GuideDaySlot.query.filter(GuideDaySlot.booking_id == booking.id).delete(synchronize_session=False)
+
+def sync_guide_day(booking, previous_status):
+    """Claim or release the booking's day after a status change"""
+    was_active = previous_status in ACTIVE_BOOKING_STATUSES
+    is_active = booking.status in ACTIVE_BOOKING_STATUSES
+    if is_active and not was_active:
+        claim_guide_day(booking)
+    elif was_active and not is_active:
+        release_guide_day(booking)
+
+def get_guide_availability(guide_id, start, end):
+    """Per-day availability for start..end inclusive, from one range read on (guide_id, date)"""
+    booked = {
+        day for (day,) in db.session.query(GuideDaySlot.date).filter(
+            GuideDaySlot.guide_id == guide_id,
+            GuideDaySlot.date >= start,
+            GuideDaySlot.date <= end
+        )
+    }
+    days = []
+    day = start
+    while day <= end:
+        days.append({'date': day.isoformat(), 'available': day not in booked})
+        day += timedelta(days=1)
+    return days
+
+def parse_date_range(args, default_days):
+    """(from, to) from ISO query args; from defaults to today and to to from + default_days"""
+    try:
+        start = date.fromisoformat(args['from']) if 'from' in args else date.today()
+        end = date.fromisoformat(args['to']) if 'to' in args else start + timedelta(days=default_days)
+    except ValueError:
+        raise ValidationError('Invalid date format. Use YYYY-MM-DD.')
+
+    if end < start:
+        raise ValidationError('to must not be before from')
+    if (end - start).days >= MAX_AVAILABILITY_DAYS:
+        raise ValidationError(f'Range must be at most {MAX_AVAILABILITY_DAYS} days')
+    return start, end
+
+def available_guides_query(start, end, destination_id=None, languages=None, specialties=None):
+    """(Guide, User) rows for guides free on every day from start to end, most experienced first.
+
+    One statement: an anti-join against the occupied days in guide_day_slots,
+    which the unique (guide_id, date) index answers per guide with a range probe.
+    """
+    occupied = db.session.query(GuideDaySlot.id).filter(
+        GuideDaySlot.guide_id == Guide.id,
+        GuideDaySlot.date >= start,
+        GuideDaySlot.date <= end
+    )
+    query = db.session.query(Guide, User).join(User, Guide.user_id == User.id) \
+        .filter(~occupied.exists())
+
+    if destination_id:
+        # Guides who work the destination: its assigned guide, or anyone who has been booked there
+        booked_there = db.session.query(Booking.id).filter(
+            Booking.guide_id == Guide.id,
+            Booking.destination_id == destination_id
+        )
+        assigned = db.session.query(Destination.id).filter(
+            Destination.id == destination_id,
+            Destination.guide_id == Guide.id
+        )
+        query = query.filter(or_(assigned.exists(), booked_there.exists()))
+
+    if languages:
+        query = query.filter(Guide.id.in_(
+            ids_having_all(GuideLanguage.guide_id, GuideLanguage.language, languages)
+        ))
+    if specialties:
+        query = query.filter(Guide.id.in_(
+            ids_having_all(GuideSpecialty.guide_id, GuideSpecialty.specialty, specialties)
+        ))
+
+    return query.order_by(Guide.experience_years.desc().nullslast(), Guide.id)
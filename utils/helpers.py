@@ -0,0 +1,120 @@
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import and_, or_, func
+from utils.db import db
+from utils.error_handlers import ValidationError
+
+MAX_CURSOR_LIMIT = 100
+
+class KeysetPage:
+    """A single page of results from keyset_paginate"""
+
+    def __init__(self, items, limit, next_cursor):
+        self.items = items
+        self.limit = limit
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def to_dict(self):
+        return {
+            'limit': self.limit,
+            'next_cursor': self.next_cursor,
+            'has_next': self.has_next
+        }
+
+def encode_cursor(values):
+    """Encode sort key values into an opaque, URL-safe cursor"""
+    raw = json.dumps([v.isoformat() if isinstance(v, (date, datetime)) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, columns):
+    """Decode a cursor produced by encode_cursor back into typed sort key values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError('cursor does not match sort columns')
+
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is not None and python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif value is not None and python_type is date:
+                value = date.fromisoformat(value)
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationError('Invalid cursor')
+
+def keyset_paginate(query, columns, cursor=None, limit=10, descending=False):
+    """Paginate by seeking past the last seen sort key instead of OFFSET + COUNT(*).
+
+    `columns` must end in a unique column (usually the primary key) so the order
+    is total. The query's existing ORDER BY is replaced. No total count is run.
+    """
+    limit = max(1, min(limit or 10, MAX_CURSOR_LIMIT))
+    entity_count = len(query.column_descriptions)
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        clauses = []
+        for i, column in enumerate(columns):
+            seek = column < values[i] if descending else column > values[i]
+            clauses.append(and_(*[columns[j] == values[j] for j in range(i)], seek))
+        query = query.filter(or_(*clauses))
+
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    # Select the sort key alongside each row so the next cursor needs no extra lookups
+    rows = query.order_by(None).order_by(*ordering).add_columns(*columns).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][entity_count:])
+
+    if entity_count == 1:
+        items = [row[0] for row in rows]
+    else:
+        items = [tuple(row[:entity_count]) for row in rows]
+
+    return KeysetPage(items, limit, next_cursor)
+
+def count_grouped(column, ids):
+    """Count rows per value of `column` for all `ids` in one grouped query.
+
+    Returns a dict of id -> count; ids with no rows are present with a count of 0.
+    Use it instead of running a COUNT per row when serializing a page of results.
+    """
+    ids = list(ids)
+    counts = dict.fromkeys(ids, 0)
+    if ids:
+        counts.update(
+            db.session.query(column, func.count()).filter(column.in_(ids)).group_by(column).all()
+        )
+    return counts
+
+def ids_having_all(owner_column, value_column, values):
+    """Subquery of `owner_column` ids that have a row for every one of `values`.
+
+    One indexed IN lookup with GROUP BY ... HAVING COUNT, instead of a join or
+    filter per value. Assumes (owner, value) pairs are unique.
+    """
+    values = list(dict.fromkeys(values))
+    return db.session.query(owner_column).filter(value_column.in_(values)) \
+        .group_by(owner_column).having(func.count() == len(values))
+
+def json_array(value):
+    """reqparse type for list fields that clients may send as a JSON array or a JSON-encoded string"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value) if value.strip() else []
+        except ValueError:
+            raise ValueError('must be a JSON array')
+    if not isinstance(value, list):
+        raise ValueError('must be a JSON array')
+    return value
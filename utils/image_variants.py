@@ -0,0 +1,65 @@
+import re
+import cloudinary
+import cloudinary.utils
+
+# Variant name -> Cloudinary transformation. Format and quality are picked per browser.
+IMAGE_VARIANTS = {
+    'thumbnail': {'width': 320, 'height': 240, 'crop': 'fill', 'gravity': 'auto'},
+    'medium': {'width': 800, 'crop': 'limit'},
+    'large': {'width': 1600, 'crop': 'limit'}
+}
+_DELIVERY_DEFAULTS = {'fetch_format': 'auto', 'quality': 'auto', 'secure': True}
+
+# https://res.cloudinary.com/<cloud>/image/upload/[<transformations>/]v<version>/<public_id>.<ext>
+_CLOUDINARY_UPLOAD_URL = re.compile(
+    r'^https?://res\.cloudinary\.com/(?P<cloud>[^/]+)/image/upload/(?:.*/)?v(?P<version>\d+)/(?P<public_id>.+?)(?:\.\w+)?$'
+)
+
+def variants_for_public_id(public_id, version=None):
+    """Variant URLs for an image stored in our Cloudinary account"""
+    return {
+        name: cloudinary.utils.cloudinary_url(public_id, version=version, **transform, **_DELIVERY_DEFAULTS)[0]
+        for name, transform in IMAGE_VARIANTS.items()
+    }
+
+def build_image_variants(url):
+    """Variant URLs for any image URL.
+
+    Our own uploads are transformed in place; external images (e.g. the seeded
+    Unsplash photos) go through Cloudinary's fetch delivery, which resizes and
+    caches them on first request. Returns {} when there is nothing to build.
+    """
+    if not url:
+        return {}
+
+    cloud_name = cloudinary.config().cloud_name
+    if not cloud_name:
+        return {}
+
+    match = _CLOUDINARY_UPLOAD_URL.match(url)
+    if match and match.group('cloud') == cloud_name:
+        return variants_for_public_id(match.group('public_id'), match.group('version'))
+
+    return {
+        name: cloudinary.utils.cloudinary_url(url, type='fetch', **transform, **_DELIVERY_DEFAULTS)[0]
+        for name, transform in IMAGE_VARIANTS.items()
+    }
+
+def compute_destination_variants(destination):
+    """Variant sets for a destination's main image and each gallery image"""
+    return {
+        'image_url': build_image_variants(destination.image_url),
+        'images': [build_image_variants(url) for url in destination.images or [] if isinstance(url, str)]
+    }
+
+def refresh_destination_variants(destination):
+    """Record variant URLs on the destination; call after image_url or images change"""
+    destination.image_variants = compute_destination_variants(destination)
+
+def get_destination_variants(destination):
+    """Stored variant sets, computed on the fly for rows recorded before variants existed"""
+    variants = destination.image_variants
+    # Rows saved while Cloudinary was unconfigured have empty sets
+    if variants and (variants.get('image_url') or not destination.image_url):
+        return variants
+    return compute_destination_variants(destination)
@@ -0,0 +1,105 @@
+import decimal
+import json
+import uuid
+from datetime import date, time
+from flask import current_app, make_response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib encoder is used instead
+    orjson = None
+
+def _default(value):
+    """Types neither encoder handles natively (orjson already covers datetime, date and UUID)"""
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def _orjson_dumps(data, sort_keys=False, indent=False):
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, default=_default, option=option)
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's own provider for the stdlib fallback, with dates written as ISO 8601 as on the orjson path"""
+
+    @staticmethod
+    def default(value):
+        if isinstance(value, (decimal.Decimal, date, time, uuid.UUID)):
+            return _default(value)
+        return DefaultJSONProvider.default(value)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """App JSON provider (jsonify, request.get_json) backed by orjson.
+
+    Dates and datetimes are written as ISO 8601 rather than Flask's HTTP date
+    format, matching the Flask-RESTful responses.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            # Callers asking for stdlib-specific options (cls, separators, ...)
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return _orjson_dumps(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = _orjson_dumps(obj, sort_keys=self.sort_keys, indent=indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+def dumps(data):
+    """Compact JSON text using the app's configured backend; for hand-built bodies such as NDJSON lines"""
+    if isinstance(current_app.json, OrjsonProvider):
+        return _orjson_dumps(data).decode('utf-8')
+    return json.dumps(data, default=_default, separators=(',', ':'))
+
+def output_orjson(data, code, headers=None):
+    """Flask-RESTful representation for application/json using orjson"""
+    response = make_response(_orjson_dumps(data, indent=current_app.debug) + b'\n', code)
+    response.headers.extend(headers or {})
+    return response
+
+def output_stdlib_json(data, code, headers=None):
+    """Flask-RESTful's own encoder, plus the same datetime/date/Decimal handling as the orjson path"""
+    settings = dict(current_app.config.get('RESTFUL_JSON', {}))
+    if current_app.debug:
+        settings.setdefault('indent', 4)
+    settings.setdefault('default', _default)
+    response = make_response(json.dumps(data, **settings) + '\n', code)
+    response.headers.extend(headers or {})
+    return response
+
+def init_json(app, *apis):
+    """Install the JSON backend selected by JSON_BACKEND on the app and the given Flask-RESTful Apis.
+
+    "orjson" (the default) falls back to the stdlib encoder when orjson is not installed.
+    """
+    backend = app.config.get('JSON_BACKEND', 'orjson')
+    if backend == 'orjson' and orjson is None:
+        app.logger.warning('JSON_BACKEND is orjson but orjson is not installed; using the stdlib encoder')
+        backend = 'json'
+
+    if backend == 'orjson':
+        app.json = OrjsonProvider(app)
+        output_json = output_orjson
+    else:
+        app.json = StdlibJSONProvider(app)
+        output_json = output_stdlib_json
+
+    for api in apis:
+        api.representations['application/json'] = output_json
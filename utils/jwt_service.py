@@ -2,12 +2,17 @@ import jwt
 import datetime
 from flask import current_app, request, jsonify, g
 from functools import wraps
+from werkzeug.local import LocalProxy
 from models.user import User  # Add this import
+from utils.auth_context import resolve_auth_context, TOKEN_CLAIMS_VERSION
 
-def create_token(user_id, role):
+def create_token(user_id, role, profile_id=None, token_version=0):
     payload = {
         "user_id": user_id,
         "role": role,
+        "pid": profile_id,  # traveler/guide/admin profile id for stateless ownership checks
+        "tv": token_version,  # must match User.token_version, bumped to revoke tokens
+        "cv": TOKEN_CLAIMS_VERSION,
         "exp": datetime.datetime.utcnow() + datetime.timedelta(hours=12)
     }
     return jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
@@ -20,6 +25,20 @@ def decode_token(token):
     except jwt.InvalidTokenError:
         return None
     
+def authenticate(data):
+    """Set g.auth and g.user for the token's user, reusing them if already resolved"""
+    auth = g.get("auth")
+    if auth is None or auth.user_id != data.get("user_id"):
+        auth = resolve_auth_context(data)
+        if not auth:
+            return None
+        g.auth = auth
+
+    # Store user in Flask's request context for Flask-RESTful compatibility.
+    # The proxy defers the users query until a handler actually reads the user.
+    g.user = LocalProxy(lambda: auth.user)
+    return auth
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -33,14 +52,10 @@ def token_required(f):
             if not data:
                 return {"success": False, "message": "Invalid token"}, 401
 
-            # Get user from database
-            from models.user import User
-            user = User.query.get(data.get("user_id"))
-            if not user:
+            # Resolve the user and role profile once per request
+            if not authenticate(data):
                 return {"success": False, "message": "User not found"}, 401
 
-            # Store user in Flask's request context for Flask-RESTful compatibility
-            g.user = user
             return f(*args, **kwargs)  # Don't pass user as parameter
         except Exception as e:
             return {"success": False, "message": "Token processing failed"}, 401
@@ -60,13 +75,10 @@ def role_required(required_role):
             if not data or data.get("role") != required_role:
                 return {"success": False, "message": "Unauthorized access"}, 403
 
-            from models.user import User
-            user = User.query.get(data.get("user_id"))
-            if not user:
+            # Resolve the user and role profile once per request
+            if not authenticate(data):
                 return {"success": False, "message": "User not found"}, 401
 
-            # Store user in Flask's request context for Flask-RESTful compatibility
-            g.user = user
             return f(*args, **kwargs)  # Don't pass user as parameter
         return decorated
     return decorator
\ No newline at end of file
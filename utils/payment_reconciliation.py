@@ -0,0 +1,139 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import click
+from flask.cli import AppGroup
+from utils.db import db
+from utils.paystack_service import paystack_service
+from models.payment import Payment
+from models.booking import Booking
+from utils.dashboard_stats import record_payment_status_change, record_booking_status_change
+
+payments_cli = AppGroup("payments", help="Payment maintenance commands.")
+
+# PayStack transaction status -> local payment status; anything else is still in flight
+PAYSTACK_FINAL_STATUSES = {
+    'success': 'completed',
+    'failed': 'failed',
+    'reversed': 'failed',
+    'abandoned': 'failed'
+}
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self._next_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_for = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_for > 0:
+            time.sleep(wait_for)
+
+def find_stale_payments(older_than, limit=None):
+    """(id, reference) of pending/processing payments created before `older_than`"""
+    query = db.session.query(Payment.id, Payment.transaction_id).filter(
+        Payment.status.in_(['pending', 'processing']),
+        Payment.created_at <= older_than,
+        Payment.transaction_id.isnot(None)
+    ).order_by(Payment.id)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+def _verify(reference, limiter):
+    """Ask PayStack for the final status of a reference; None while it is still in flight"""
+    limiter.wait()
+    result = paystack_service.verify_transaction(reference)
+    if 'data' not in result:
+        # Network error or unparseable response; nothing is known about the transaction
+        raise RuntimeError(result.get('message'))
+    paystack_status = (result['data'] or {}).get('status')
+    return PAYSTACK_FINAL_STATUSES.get(paystack_status)
+
+def apply_reconciled_statuses(resolved):
+    """Apply {payment_id: new_status} in one transaction, skipping payments that moved meanwhile.
+
+    Returns the number of payments changed.
+    """
+    payments = Payment.query.filter(
+        Payment.id.in_(list(resolved)),
+        Payment.status.in_(['pending', 'processing'])
+    ).with_for_update().all()
+
+    booking_ids = [payment.booking_id for payment in payments if resolved[payment.id] == 'completed']
+    bookings = {}
+    if booking_ids:
+        bookings = {booking.id: booking for booking in Booking.query.filter(Booking.id.in_(booking_ids)).all()}
+
+    for payment in payments:
+        new_status = resolved[payment.id]
+        record_payment_status_change(payment, payment.status, new_status)
+        payment.status = new_status
+
+        booking = bookings.get(payment.booking_id)
+        if booking and booking.status == 'pending':
+            booking.status = 'confirmed'
+            record_booking_status_change('pending', 'confirmed')
+
+    db.session.commit()
+    return len(payments)
+
+@payments_cli.command("reconcile")
+@click.option("--older-than", default=30, show_default=True, help="Minutes a payment must have been pending.")
+@click.option("--workers", default=4, show_default=True, help="Concurrent verify calls.")
+@click.option("--rate", default=5.0, show_default=True, help="Maximum verify calls per second (0 = unlimited).")
+@click.option("--batch-size", default=50, show_default=True, help="Payments updated per transaction.")
+@click.option("--limit", type=int, help="Only reconcile this many payments.")
+@click.option("--dry-run", is_flag=True, help="Report what would change without writing.")
+def reconcile_command(older_than, workers, rate, batch_size, limit, dry_run):
+    """Verify stale pending/processing payments with PayStack and apply their final status."""
+    stale = find_stale_payments(datetime.utcnow() - timedelta(minutes=older_than), limit)
+    total = len(stale)
+    click.echo(f"Found {total} payment(s) pending for over {older_than} minute(s)")
+    if not total:
+        return
+
+    limiter = RateLimiter(rate)
+    stats = {'checked': 0, 'completed': 0, 'failed': 0, 'in_flight': 0, 'errors': 0, 'updated': 0}
+    started = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='reconcile') as executor:
+        for offset in range(0, total, batch_size):
+            batch = stale[offset:offset + batch_size]
+            futures = {payment_id: executor.submit(_verify, reference, limiter) for payment_id, reference in batch}
+
+            resolved = {}
+            for payment_id, future in futures.items():
+                stats['checked'] += 1
+                try:
+                    new_status = future.result()
+                except Exception:
+                    stats['errors'] += 1
+                    continue
+                if new_status is None:
+                    stats['in_flight'] += 1
+                else:
+                    stats[new_status] += 1
+                    resolved[payment_id] = new_status
+
+            if resolved and not dry_run:
+                stats['updated'] += apply_reconciled_statuses(resolved)
+
+            elapsed = max(time.monotonic() - started, 1e-6)
+            click.echo(
+                f"[{stats['checked']}/{total}] completed={stats['completed']} failed={stats['failed']} "
+                f"in_flight={stats['in_flight']} errors={stats['errors']} updated={stats['updated']} "
+                f"({stats['checked'] / elapsed:.1f}/s)"
+            )
+
+    if dry_run:
+        click.echo("Dry run: no payments were changed")
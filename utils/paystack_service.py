@@ -1,23 +1,127 @@
 import requests
-import os
-from flask import current_app
+import threading
+import time
+from collections import deque
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class EndpointMetrics:
+    """Per-endpoint call counts and latency for outbound PayStack requests"""
+
+    def __init__(self, sample_size=500):
+        self.sample_size = sample_size
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, elapsed_ms, error=False):
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = {
+                    'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'samples': deque(maxlen=self.sample_size)
+                }
+            stats['count'] += 1
+            stats['errors'] += int(error)
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['samples'].append(elapsed_ms)
+
+    def snapshot(self):
+        """Return a JSON-serializable summary; percentiles cover the most recent samples"""
+        with self._lock:
+            summary = {}
+            for endpoint, stats in self._endpoints.items():
+                samples = sorted(stats['samples'])
+                summary[endpoint] = {
+                    'count': stats['count'],
+                    'errors': stats['errors'],
+                    'avg_ms': round(stats['total_ms'] / stats['count'], 2),
+                    'p50_ms': round(samples[int(len(samples) * 0.50)], 2),
+                    'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 2),
+                    'max_ms': round(stats['max_ms'], 2)
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
 
 class PayStackService:
-    def __init__(self):
-        self.secret_key = os.getenv('PAYSTACK_SECRET_KEY')
-        self.public_key = os.getenv('PAYSTACK_PUBLIC_KEY')
+    """PayStack API client shared by the app; init_app applies the PAYSTACK_* settings"""
+
+    def __init__(self, app=None):
+        self.secret_key = None
+        self.public_key = None
         self.base_url = 'https://api.paystack.co'
 
+        # (connect, read) seconds; a slow PayStack must not hold a worker indefinitely
+        self.timeout = (3.05, 10)
+        self.metrics = EndpointMetrics()
+        self.session = self._build_session(10)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.secret_key = app.config.get('PAYSTACK_SECRET_KEY')
+        self.public_key = app.config.get('PAYSTACK_PUBLIC_KEY')
+        self.base_url = app.config.get('PAYSTACK_BASE_URL', self.base_url)
+        self.timeout = (
+            app.config.get('PAYSTACK_CONNECT_TIMEOUT', self.timeout[0]),
+            app.config.get('PAYSTACK_READ_TIMEOUT', self.timeout[1])
+        )
+        self.session.close()
+        self.session = self._build_session(app.config.get('PAYSTACK_POOL_SIZE', 10))
+        app.extensions['paystack'] = self
+
+    def _build_session(self, pool_size):
+        """Shared keep-alive session.
+
+        Connection failures are retried for every call since nothing reached
+        PayStack. Read errors and 429/5xx responses are only retried for GET
+        (verify), which is idempotent; initialize and transfer are never replayed.
+        """
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=2,
+            status=2,
+            backoff_factor=0.3,
+            backoff_jitter=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
     def get_headers(self):
         return {
             'Authorization': f'Bearer {self.secret_key}',
             'Content-Type': 'application/json'
         }
 
+    def _request(self, method, endpoint, path, **kwargs):
+        """Send a request over the pooled session, recording latency under `endpoint`"""
+        started = time.perf_counter()
+        error = True
+        try:
+            response = self.session.request(
+                method, f"{self.base_url}{path}", headers=self.get_headers(),
+                timeout=self.timeout, **kwargs
+            )
+            error = response.status_code >= 500
+            return response.json()
+        finally:
+            self.metrics.record(endpoint, (time.perf_counter() - started) * 1000, error=error)
+
     def initialize_transaction(self, email, amount, reference=None, callback_url=None):
         """Initialize a PayStack transaction"""
         try:
-            url = f"{self.base_url}/transaction/initialize"
             payload = {
                 'email': email,
                 'amount': int(amount * 100),  # PayStack expects amount in kobo
@@ -25,8 +129,7 @@ class PayStackService:
                 'callback_url': callback_url
             }
             
-            response = requests.post(url, json=payload, headers=self.get_headers())
-            response_data = response.json()
+            response_data = self._request('POST', 'transaction.initialize', '/transaction/initialize', json=payload)
             
             if response_data.get('status'):
                 return {
@@ -50,9 +153,7 @@ class PayStackService:
     def verify_transaction(self, reference):
         """Verify a PayStack transaction"""
         try:
-            url = f"{self.base_url}/transaction/verify/{reference}"
-            response = requests.get(url, headers=self.get_headers())
-            response_data = response.json()
+            response_data = self._request('GET', 'transaction.verify', f"/transaction/verify/{reference}")
             
             if response_data.get('status') and response_data['data']['status'] == 'success':
                 return {
@@ -63,6 +164,7 @@ class PayStackService:
             else:
                 return {
                     'success': False,
+                    'data': response_data.get('data'),  # Carries the abandoned/failed/ongoing status when known
                     'message': response_data.get('message', 'Transaction verification failed')
                 }
                 
@@ -75,7 +177,6 @@ class PayStackService:
     def create_transfer_recipient(self, name, account_number, bank_code, type='nuban'):
         """Create a transfer recipient for guide payouts"""
         try:
-            url = f"{self.base_url}/transferrecipient"
             payload = {
                 'type': type,
                 'name': name,
@@ -84,8 +185,7 @@ class PayStackService:
                 'currency': 'KES'
             }
             
-            response = requests.post(url, json=payload, headers=self.get_headers())
-            response_data = response.json()
+            response_data = self._request('POST', 'transferrecipient', '/transferrecipient', json=payload)
             
             if response_data.get('status'):
                 return {
@@ -107,7 +207,6 @@ class PayStackService:
     def initiate_transfer(self, recipient_code, amount, reason):
         """Initiate transfer to guide (payout)"""
         try:
-            url = f"{self.base_url}/transfer"
             payload = {
                 'source': 'balance',
                 'amount': int(amount * 100),  # Convert to kobo
@@ -115,8 +214,7 @@ class PayStackService:
                 'reason': reason
             }
             
-            response = requests.post(url, json=payload, headers=self.get_headers())
-            response_data = response.json()
+            response_data = self._request('POST', 'transfer', '/transfer', json=payload)
             
             if response_data.get('status'):
                 return {
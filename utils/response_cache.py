@@ -0,0 +1,210 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, Response
+from werkzeug.http import http_date
+from utils.conditional_get import mark_not_modified_early
+
+# Bumped with every purge so a response built across a purge is not cached
+EPOCH_TAG = '*'
+
+class LocalCacheBackend:
+    """In-process LRU with per-entry TTL. Tag versions are kept apart from the
+    LRU so evicting them can never make a stale entry look current again.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_tag_versions(self, tags):
+        with self._lock:
+            return [self._tags.get(tag, 0) for tag in tags]
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+class RedisCacheBackend:
+    """Shared backend for multi-worker deployments; needs the optional `redis` package.
+
+    Any client with get/set/mget/incr works, so tests can pass a local fake.
+    """
+
+    def __init__(self, url=None, client=None, prefix='rc:'):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(f'{self.prefix}entry:{key}')
+        return json.loads(raw) if raw else None
+
+    def set(self, key, value, ttl):
+        self.client.set(f'{self.prefix}entry:{key}', json.dumps(value), ex=int(ttl))
+
+    def get_tag_versions(self, tags):
+        if not tags:
+            return []
+        return [int(version or 0) for version in self.client.mget([f'{self.prefix}tag:{tag}' for tag in tags])]
+
+    def bump_tags(self, tags):
+        for tag in tags:
+            self.client.incr(f'{self.prefix}tag:{tag}')
+
+class ResponseCache:
+    """Caches public GET responses keyed by endpoint, view args and normalized query args.
+
+    Each entry records the versions of the tags it depends on ("destinations",
+    "destination:3", ...). Purging a tag bumps its version, so every entry that
+    depends on it stops matching without scanning the cache.
+    """
+
+    def __init__(self):
+        self.backend = None
+        self.ttl = 60
+        self.enabled = False
+
+    def init_app(self, app, backend=None):
+        self.ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        self.enabled = app.config.get('RESPONSE_CACHE_ENABLED', True)
+        if backend is None:
+            url = app.config.get('RESPONSE_CACHE_URL')
+            if url:
+                backend = RedisCacheBackend(url)
+            else:
+                backend = LocalCacheBackend(app.config.get('RESPONSE_CACHE_SIZE', 1024))
+        self.backend = backend
+        app.extensions['response_cache'] = self
+
+    def request_key(self):
+        query = sorted(request.args.items(multi=True))
+        raw = json.dumps([request.endpoint, sorted((request.view_args or {}).items()), query])
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def lookup(self, key):
+        entry = self.backend.get(key)
+        if entry is None:
+            return None
+        tags = list(entry['tags'])
+        if self.backend.get_tag_versions(tags) != [entry['tags'][tag] for tag in tags]:
+            return None
+        return entry
+
+    def epoch(self):
+        """Changes on every purge; taken before building a response"""
+        return self.backend.get_tag_versions([EPOCH_TAG])[0]
+
+    def store(self, key, payload, tags, epoch):
+        """Cache the payload unless a purge ran while it was being built"""
+        tags = list(dict.fromkeys(tags))
+        body = json.dumps(payload, sort_keys=True, default=str)
+        versions = self.backend.get_tag_versions([EPOCH_TAG] + tags)
+        entry = {
+            'payload': payload,
+            'etag': hashlib.sha1(body.encode('utf-8')).hexdigest(),
+            'last_modified': int(time.time()),
+            'tags': dict(zip(tags, versions[1:]))
+        }
+        if versions[0] == epoch:
+            self.backend.set(key, entry, self.ttl)
+        return entry
+
+    def purge(self, *tags):
+        """Invalidate every cached response tagged with any of `tags`; call after commit"""
+        if not self.enabled or self.backend is None:
+            return
+        try:
+            self.backend.bump_tags([tag for tag in tags if tag] + [EPOCH_TAG])
+        except Exception:
+            current_app.logger.exception('Response cache purge failed for %s', tags)
+
+response_cache = ResponseCache()
+
+def purge_cache_tags(*tags):
+    response_cache.purge(*tags)
+
+def _cached_response(entry):
+    """200 with validators, or 304 when the client's copy is still current"""
+    etag = entry['etag']
+    headers = {
+        'ETag': f'"{etag}"',
+        'Last-Modified': http_date(entry['last_modified']),
+        'Cache-Control': 'no-cache'
+    }
+    if request.if_none_match.contains(etag) or (
+            not request.if_none_match and request.if_modified_since
+            and request.if_modified_since.timestamp() >= entry['last_modified']):
+        return Response(status=304, headers=headers)
+    return entry['payload'], 200, headers
+
+def cached_response(tags):
+    """Cache a public Resource GET; `tags(payload, **view_args)` names what the response depends on.
+
+    Only 200 responses are cached. Cache backend failures fall back to the handler.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not response_cache.enabled:
+                return f(*args, **kwargs)
+
+            try:
+                key = response_cache.request_key()
+                entry = response_cache.lookup(key)
+                epoch = response_cache.epoch()
+            except Exception:
+                current_app.logger.exception('Response cache lookup failed')
+                return f(*args, **kwargs)
+
+            if entry is not None:
+                response = _cached_response(entry)
+                if isinstance(response, Response):
+                    # 304 served without running the handler
+                    mark_not_modified_early()
+                return response
+
+            result = f(*args, **kwargs)
+            if not isinstance(result, tuple) or len(result) < 2 or result[1] != 200:
+                return result
+            try:
+                entry = response_cache.store(key, result[0], tags(result[0], **kwargs), epoch)
+            except Exception:
+                current_app.logger.exception('Response cache store failed')
+                return result
+
+            return _cached_response(entry)
+        return decorated
+    return decorator
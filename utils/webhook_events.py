@@ -0,0 +1,211 @@
+import hashlib
+import threading
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from utils.db import db
+from utils.background import CoalescedTask
+from models.webhook_event import WebhookEvent
+from models.payment import Payment
+from models.booking import Booking
+from utils.dashboard_stats import record_payment_status_change, record_booking_status_change
+
+webhooks_cli = AppGroup("webhooks", help="Process and replay logged PayStack webhook events.")
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+# Seconds before events that raised are tried again
+RETRY_DELAY = 30
+
+def webhook_event_key(data, payload):
+    """Deduplication key: PayStack retries a delivery with the same event and transaction"""
+    event_data = data.get('data') or {}
+    identifier = event_data.get('id') or event_data.get('reference')
+    if identifier is None:
+        identifier = hashlib.sha256(payload).hexdigest()
+    return f"{data.get('event')}:{identifier}"
+
+def record_webhook_event(data, payload):
+    """Append a verified delivery to the event log. Returns False if it was already logged."""
+    event = WebhookEvent(
+        event_key=webhook_event_key(data, payload),
+        event=data.get('event') or 'unknown',
+        reference=(data.get('data') or {}).get('reference'),
+        payload=payload.decode('utf-8')
+    )
+    db.session.add(event)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+def _apply_event(event, payments, bookings):
+    """Apply one event's state transition; returns the event's new status.
+
+    Transitions are idempotent: replaying an event whose effect is already
+    visible changes nothing, so counters are only moved on a real change.
+    A late charge.failed never overrides a completed payment.
+    """
+    if event.event not in ('charge.success', 'charge.failed'):
+        return 'ignored'
+
+    payment = payments.get(event.reference)
+    if payment is None:
+        event.error = 'Payment not found'
+        return 'ignored'
+
+    if event.event == 'charge.success':
+        if payment.status != 'completed':
+            record_payment_status_change(payment, payment.status, 'completed')
+            payment.status = 'completed'
+
+        booking = bookings.get(payment.booking_id)
+        if booking and booking.status == 'pending':
+            booking.status = 'confirmed'
+            record_booking_status_change('pending', 'confirmed')
+    elif payment.status not in ('completed', 'failed'):
+        record_payment_status_change(payment, payment.status, 'failed')
+        payment.status = 'failed'
+
+    return 'processed'
+
+def _apply_events(events):
+    """Apply events in order, loading every payment and booking they touch up front (two queries)"""
+    references = {event.reference for event in events if event.reference}
+    payments = {}
+    if references:
+        payments = {
+            payment.transaction_id: payment for payment in
+            Payment.query.filter(Payment.transaction_id.in_(references)).with_for_update().all()
+        }
+    booking_ids = {payment.booking_id for payment in payments.values()}
+    bookings = {}
+    if booking_ids:
+        bookings = {booking.id: booking for booking in Booking.query.filter(Booking.id.in_(booking_ids)).all()}
+
+    now = datetime.utcnow()
+    for event in events:
+        event.status = _apply_event(event, payments, bookings)
+        event.attempts += 1
+        event.processed_at = now
+
+def _apply_events_individually(event_ids):
+    """Apply each event in its own savepoint after its batch failed. Returns how many raised.
+
+    Only an event that raises is charged the attempt, so one bad event cannot
+    park the healthy events it was batched with.
+    """
+    events = WebhookEvent.query.filter(WebhookEvent.id.in_(event_ids), WebhookEvent.status == 'pending') \
+        .order_by(WebhookEvent.id).with_for_update(skip_locked=True).all()
+    failed = 0
+    for event in events:
+        try:
+            with db.session.begin_nested():
+                _apply_events([event])
+        except Exception as e:
+            failed += 1
+            event.attempts += 1
+            event.error = str(e)
+            if event.attempts >= MAX_ATTEMPTS:
+                # Parked for replay
+                event.status = 'failed'
+    db.session.commit()
+    return failed
+
+def process_webhook_batch(batch_size=BATCH_SIZE, after_id=0):
+    """Apply the oldest pending events with ids above `after_id` in one transaction.
+
+    If the batch raises it is rolled back and retried one event at a time.
+    Returns (events handled, last event id, events that raised).
+    """
+    events = WebhookEvent.query.filter(WebhookEvent.status == 'pending', WebhookEvent.id > after_id) \
+        .order_by(WebhookEvent.id).limit(batch_size) \
+        .with_for_update(skip_locked=True).all()
+    if not events:
+        return 0, after_id, 0
+
+    event_ids = [event.id for event in events]
+    try:
+        _apply_events(events)
+        db.session.commit()
+        return len(event_ids), event_ids[-1], 0
+    except Exception:
+        db.session.rollback()
+        current_app.logger.warning('Webhook batch %s-%s failed; applying its events one at a time',
+                                   event_ids[0], event_ids[-1], exc_info=True)
+
+    return len(event_ids), event_ids[-1], _apply_events_individually(event_ids)
+
+def drain_webhook_events(batch_size=BATCH_SIZE):
+    """Apply pending events in batches until none are left. Returns how many were applied.
+
+    Each event is tried at most once per drain. Events that raised are retried
+    by another drain RETRY_DELAY seconds later rather than on the next webhook.
+    """
+    processed = failed = 0
+    last_id = 0
+    while True:
+        handled, last_id, batch_failed = process_webhook_batch(batch_size, after_id=last_id)
+        processed += handled - batch_failed
+        failed += batch_failed
+        if handled < batch_size:
+            break
+    if failed:
+        _schedule_retry()
+    return processed
+
+def _schedule_retry():
+    timer = threading.Timer(RETRY_DELAY, schedule_webhook_processing)
+    timer.daemon = True
+    timer.start()
+
+webhook_consumer = CoalescedTask(drain_webhook_events)
+
+def schedule_webhook_processing():
+    webhook_consumer.schedule()
+
+@webhooks_cli.command("process")
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True)
+def process_command(batch_size):
+    """Apply all pending webhook events now."""
+    processed = webhook_consumer.run(batch_size)
+    click.echo(f"Processed {processed} event(s)")
+
+@webhooks_cli.command("replay")
+@click.option("--id", "event_ids", multiple=True, type=int, help="Event id to replay (repeatable).")
+@click.option("--reference", help="Replay every event for this payment reference.")
+@click.option("--status", "from_status", type=click.Choice(["failed", "ignored", "processed"]),
+              help="Replay every event currently in this status.")
+@click.option("--since", type=click.DateTime(), help="Only events received at or after this time.")
+@click.option("--batch-size", default=BATCH_SIZE, show_default=True)
+def replay_command(event_ids, reference, from_status, since, batch_size):
+    """Reset matching logged events to pending and apply them again.
+
+    Transitions are idempotent, so replaying events that were already applied is safe.
+    """
+    if not (event_ids or reference or from_status):
+        raise click.UsageError("Pass at least one of --id, --reference or --status.")
+
+    query = update(WebhookEvent)
+    if event_ids:
+        query = query.where(WebhookEvent.id.in_(event_ids))
+    if reference:
+        query = query.where(WebhookEvent.reference == reference)
+    if from_status:
+        query = query.where(WebhookEvent.status == from_status)
+    if since:
+        query = query.where(WebhookEvent.received_at >= since)
+
+    reset = db.session.execute(
+        query.values(status='pending', attempts=0, error=None, processed_at=None)
+    ).rowcount
+    db.session.commit()
+    click.echo(f"Queued {reset} event(s) for replay")
+
+    processed = webhook_consumer.run(batch_size)
+    click.echo(f"Processed {processed} event(s)")